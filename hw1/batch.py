@@ -0,0 +1,187 @@
+"""Solves many puzzle instances in parallel.
+
+Every non-empty line of the input is an instance: either the 16 numbers of a
+15-puzzle board in row-major order (the numbers of the FifteensNode input_str
+on a single line), the 9 or 25 numbers of an 8- or 24-puzzle board, or a single
+number n for the Superqueens problem on an n x n board. Lines starting with #
+are skipped. Results are written as JSON lines, in the order in which the
+instances are solved ::
+
+    python batch.py instances.txt --workers 8 --time-limit 60
+    {"instance": 0, "input": "...", "status": "solved", "length": 42, "cost": 42, "expansions": 10233, ...}
+
+The status is "solved", "unsolved" (the board has the wrong parity or the search
+space was exhausted), "limit" (the time or expansion budget was reached) or
+"error" (the line could not be parsed). A "limit" result names the exhausted
+budget in "reason" and, for A*, reports in "best_f" the largest f expanded, a
+lower bound on the cost with a consistent heuristic.
+
+With --weight the solutions are found faster but may cost up to weight times the
+optimum; with --anytime, ARA* improves its solution until the weight reaches 1 or
+the budget runs out, and the best one is reported even with the "limit" status.
+The "bound" field is the factor by which the reported cost may exceed the
+optimum.
+
+The worker processes are reused for all instances, so the modules and the
+pattern databases are loaded once per worker. With --cache, the A* searches share
+their solved states through a sqlite file, and "cache_hits" counts the expanded
+states whose cost to the goal was already known.
+
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cache import SolutionCache
+from heuristics import HEURISTICS
+from patterndb import PARTITIONS, AdditivePDB
+from problems import FifteensNode, PackedFifteensNode, SuperqueensNode
+from search import ARAstar, Astar, SearchLimitExceeded, SearchStats
+
+NODES = {
+    'fifteens': FifteensNode,
+    'packed': PackedFifteensNode,
+}
+
+# set in every worker process by _init_worker
+_options = None
+_heuristic = None
+_cache = None
+
+
+def parse_instance(line, node=PackedFifteensNode, heuristic=None):
+    """Returns the root node of an instance given its line.
+
+    Parameters
+    ----------
+    line : str
+        The instance line.
+
+    node : class, optional
+        The node class of sliding puzzle instances. Default is PackedFifteensNode.
+
+    heuristic : callable, optional
+        The heuristic of 15-puzzle instances. Default is None, the Manhattan distance,
+        which is the only heuristic of the other sliding puzzles.
+
+    Raises
+    ------
+        ValueError
+            If the line is neither a board of a sliding puzzle nor a Superqueens board size.
+    """
+    numbers = [int(n) for n in line.split()]
+    if len(numbers) == 1:
+        return SuperqueensNode(n=numbers[0])
+    size = round(len(numbers) ** 0.5)
+    if size > 1 and sorted(numbers) == list(range(size * size)):
+        if heuristic is not None and size != 4:
+            raise ValueError('the heuristic only applies to the 15 puzzle')
+        input_str = '\n'.join(' '.join(str(n) for n in numbers[i:i + size]) for i in range(0, size * size, size))
+        return node(input_str=input_str, heuristic=heuristic)
+    raise ValueError('expected a board size or the N * N numbers of a sliding puzzle board')
+
+
+def _init_worker(options):
+    global _options, _heuristic, _cache
+    _options = options
+    if options.cache is not None:
+        _cache = SolutionCache(options.cache)
+    if options.heuristic == 'pdb':
+        _heuristic = AdditivePDB.load(options.pdb_directory, options.partition)
+    elif options.heuristic != 'manhattan':
+        _heuristic = HEURISTICS[options.heuristic]
+        _heuristic(list(range(1, 16)) + [0])  # build the lookup tables once per worker
+
+
+def anytime_weights(weight):
+    """Returns the ARA* weight schedule starting at weight: the excess over 1 is halved
+    at every iteration until it drops below 0.1, and the last weight is 1."""
+    weights = []
+    while weight - 1 >= 0.1:
+        weights.append(weight)
+        weight = 1 + (weight - 1) / 2
+    return weights + [1]
+
+
+def _solve(index, line):
+    result = {'instance': index, 'input': line}
+    start = time.perf_counter()
+    stats = SearchStats()
+    try:
+        root = parse_instance(line, NODES[_options.node], _heuristic)
+    except ValueError as e:
+        result.update(status='error', error=str(e))
+        return result
+
+    weight = _options.weight
+    path = bound = None
+    try:
+        if _options.anytime:
+            for path, bound in ARAstar(root, anytime_weights(weight), stats=stats,
+                                       max_expansions=_options.max_expansions, time_limit=_options.time_limit):
+                pass
+        else:
+            # the bucket fringe needs integer priorities
+            fringe = _options.fringe if weight == int(weight) else 'heap'
+            hits = 0 if _cache is None else _cache.memory_hits + _cache.disk_hits
+            path = Astar(root, fringe=fringe, stats=stats, max_expansions=_options.max_expansions,
+                         time_limit=_options.time_limit, weight=weight, cache=_cache)
+            if _cache is not None:
+                result['cache_hits'] = _cache.memory_hits + _cache.disk_hits - hits
+            bound = weight
+    except SearchLimitExceeded as e:
+        result.update(status='limit', reason=e.status, error=str(e))
+        if e.best_f is not None:
+            result['best_f'] = e.best_f
+    else:
+        result['status'] = 'unsolved' if path is None else 'solved'
+    if path is not None:
+        result.update(length=len(path) - 1, cost=path[-1].g, bound=bound)
+    result.update(expansions=stats.expanded, wall_time=round(time.perf_counter() - start, 6))
+    return result
+
+
+def read_instances(lines):
+    """Yields the index and the stripped text of the instance lines."""
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield index, line
+            index += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', nargs='?', type=argparse.FileType('r'), default=sys.stdin,
+                        help='the instance file, standard input by default')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes, all CPUs by default')
+    parser.add_argument('--time-limit', type=float, default=None, help='wall time budget per instance in seconds')
+    parser.add_argument('--max-expansions', type=int, default=None, help='expansion budget per instance')
+    parser.add_argument('--weight', type=float, default=1,
+                        help='weighted A* with f = g + weight * h, or the first ARA* weight with --anytime')
+    parser.add_argument('--anytime', action='store_true',
+                        help='run ARA* and report its best solution when it ends or runs out of budget')
+    parser.add_argument('--node', choices=sorted(NODES), default='packed', help='15-puzzle node representation')
+    parser.add_argument('--fringe', choices=['bucket', 'heap'], default='bucket')
+    parser.add_argument('--heuristic', choices=sorted(HEURISTICS) + ['pdb'], default='manhattan',
+                        help='15-puzzle heuristic')
+    parser.add_argument('--partition', choices=sorted(PARTITIONS), default='5-5-5',
+                        help='pattern database partition')
+    parser.add_argument('--pdb-directory', default='pdb', help='where the pattern databases are stored')
+    parser.add_argument('--cache', default=None,
+                        help='sqlite file of solved states shared by the workers and across runs, see cache.py')
+    args = parser.parse_args(argv)
+
+    options = argparse.Namespace(**{k: v for k, v in vars(args).items() if k != 'input'})
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(options,)) as executor:
+        futures = [executor.submit(_solve, index, line) for index, line in read_instances(args.input)]
+        for future in as_completed(futures):
+            print(json.dumps(future.result()), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""Benchmarks for the search engines and problem representations.
+
+Run one of the benchmarks by name, for example ::
+
+    python benchmark.py fringe
+
+"""
+
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+from fringe import FRINGES, make_fringe
+from patterndb import PARTITIONS, AdditivePDB
+from problems import FifteensNode, PackedFifteensNode, SuperqueensNode
+from heuristics import HEURISTICS
+from parallel import HDAstar
+from search import Astar, BeamSearch, SearchLimitExceeded, SearchStats, SMAstar
+
+GOAL_TILES = tuple(range(1, 16)) + (0,)
+
+
+def scramble(moves, seed, size=4):
+    """Returns the input string of a puzzle obtained by a random walk of the empty
+    cell from the goal configuration. The walk never undoes its previous move, so the
+    optimal solution is at most `moves` long and the instance is always solvable.
+    """
+    rng = random.Random(seed)
+    tiles = list(range(1, size * size)) + [0]
+    blank = size * size - 1
+    previous = None
+    for _ in range(moves):
+        x, y = divmod(blank, size)
+        options = []
+        if x > 0:
+            options.append(blank - size)
+        if x < size - 1:
+            options.append(blank + size)
+        if y > 0:
+            options.append(blank - 1)
+        if y < size - 1:
+            options.append(blank + 1)
+        options = [i for i in options if i != previous]
+        target = rng.choice(options)
+        tiles[blank], tiles[target] = tiles[target], 0
+        previous, blank = blank, target
+    rows = [tiles[i:i + size] for i in range(0, size * size, size)]
+    return '\n'.join(' '.join(str(t) for t in row) for row in rows)
+
+
+def timed(function, *args, **kwargs):
+    """Calls the function and returns its result and the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_fringe(args):
+    """Compares the fringe structures, in isolation and inside Astar on the 15 puzzle."""
+    rng = random.Random(args.seed)
+    items = [(rng.randrange(40, 60), rng.randrange(0, 40)) for _ in range(args.operations)]
+    print('%-8s %14s %14s' % ('fringe', 'push+pop (s)', 'Astar (s)'))
+    instances = [scramble(args.moves, args.seed + i) for i in range(args.instances)]
+    for name in sorted(FRINGES):
+        fringe = make_fringe(name)
+        start = time.perf_counter()
+        for f, g in items:
+            fringe.push(f, g, None)
+        while fringe:
+            fringe.pop()
+        queue_time = time.perf_counter() - start
+
+        search_time = 0.0
+        for input_str in instances:
+            _, elapsed = timed(Astar, FifteensNode(input_str=input_str), fringe=name)
+            search_time += elapsed
+        print('%-8s %14.4f %14.4f' % (name, queue_time, search_time))
+
+
+def _solve(root):
+    # solves an instance and returns the solution length, the expansions and the wall time
+    stats = SearchStats()
+    path, elapsed = timed(Astar, root, fringe='bucket', stats=stats)
+    return len(path) - 1, stats.expanded, elapsed
+
+
+def bench_pdb(args):
+    """Compares the Manhattan distance with an additive pattern database on the 15 puzzle."""
+    if not os.path.isdir(args.pdb_directory):
+        print('building the %s pattern databases into %s' % (args.partition, args.pdb_directory))
+        _, elapsed = timed(lambda: AdditivePDB.build(args.partition).save(args.pdb_directory))
+        print('built in %.1f s' % elapsed)
+    pdb = AdditivePDB.load(args.pdb_directory, args.partition)
+    print('%-10s %8s %12s %12s %10s %10s' % ('instance', 'length', 'manhattan', 'pdb', 'md (s)', 'pdb (s)'))
+    for i in range(args.instances):
+        input_str = scramble(args.moves, args.seed + i)
+        row = [_solve(PackedFifteensNode(input_str=input_str, heuristic=heuristic)) for heuristic in (None, pdb)]
+        (length, md_expansions, md_time), (_, pdb_expansions, pdb_time) = row
+        print('%-10d %8d %12d %12d %10.3f %10.3f' % (i, length, md_expansions, pdb_expansions, md_time, pdb_time))
+
+
+def bench_batched(args):
+    """Compares the batched expansion of Astar with the scalar one for several batch sizes,
+    with the Manhattan distance and the pattern database: total time and expansions over the
+    instances, and the smallest batch size beating the scalar path."""
+    heuristics = [('manhattan', None)]
+    if os.path.isdir(args.pdb_directory):
+        heuristics.append(('pdb', AdditivePDB.load(args.pdb_directory, args.partition)))
+    else:
+        print('no pattern databases in %s, see the pdb benchmark' % args.pdb_directory)
+    roots = [scramble(args.moves, args.seed + i) for i in range(args.instances)]
+    print('%-10s %10s %12s %10s' % ('heuristic', 'batch', 'expansions', 'time (s)'))
+    for name, heuristic in heuristics:
+        crossover = None
+        scalar_time = None
+        for batch_size in [None] + args.batch_sizes:
+            expansions = 0
+            elapsed = 0.0
+            for input_str in roots:
+                stats = SearchStats()
+                Astar(PackedFifteensNode(input_str=input_str, heuristic=heuristic), fringe='bucket', stats=stats,
+                      batch_size=batch_size)
+                expansions += stats.expanded
+                elapsed += stats.time_total
+            if batch_size is None:
+                scalar_time = elapsed
+            elif crossover is None and elapsed < scalar_time:
+                crossover = batch_size
+            print('%-10s %10s %12d %10.3f' % (name, batch_size or 'scalar', expansions, elapsed))
+        print('%-10s %10s' % (name, 'crossover'), crossover or '-')
+
+
+def bench_heuristics(args):
+    """Compares the 15-puzzle heuristics: expansions and time per instance."""
+    names = sorted(HEURISTICS)
+    for heuristic in HEURISTICS.values():
+        heuristic(GOAL_TILES)  # build the lookup tables outside of the timings
+    print('%-10s %8s' % ('instance', 'length') + ''.join(' %18s %8s' % (name, 's') for name in names))
+    totals = dict.fromkeys(names, (0, 0.0))
+    for i in range(args.instances):
+        input_str = scramble(args.moves, args.seed + i)
+        line = ''
+        for name in names:
+            length, expansions, elapsed = _solve(PackedFifteensNode(input_str=input_str, heuristic=HEURISTICS[name]))
+            line += ' %18d %8.3f' % (expansions, elapsed)
+            totals[name] = (totals[name][0] + expansions, totals[name][1] + elapsed)
+        print('%-10d %8d' % (i, length) + line)
+    print('%-10s %8s' % ('total', '') + ''.join(' %18d %8.3f' % totals[name] for name in names))
+
+
+class _ZeroHeuristicSuperqueensNode(SuperqueensNode):
+    # the Superqueens node without its heuristic, i.e. uniform-cost search
+
+    def evaluate_heuristic(self):
+        return 0
+
+
+def bench_superqueens(args):
+    """Solves Superqueens boards of increasing size with and without the heuristic:
+    conflicts, expansions and time. Runs over the time limit are reported as -."""
+    print('%-4s %10s %12s %10s %12s %10s' % ('n', 'conflicts', 'zero h', 'time (s)', 'bound h', 'time (s)'))
+    for n in range(args.min_n, args.max_n + 1):
+        line = ''
+        conflicts = '-'
+        for cls in (_ZeroHeuristicSuperqueensNode, SuperqueensNode):
+            stats = SearchStats()
+            try:
+                path, elapsed = timed(Astar, cls(n=n), fringe='bucket', stats=stats,
+                                      time_limit=args.time_limit)
+            except SearchLimitExceeded:
+                line += ' %12s %10s' % ('-', '-')
+            else:
+                conflicts = path[-1].g
+                line += ' %12d %10.3f' % (stats.expanded, elapsed)
+        print('%-4d %10s' % (n, conflicts) + line)
+
+
+def _expand_all(root, limit):
+    # breadth-first expansion that keeps every generated node alive, like a fringe does
+    nodes = [root]
+    i = 0
+    while len(nodes) < limit:
+        nodes.extend(nodes[i].generate_children())
+        i += 1
+    return nodes
+
+
+def bench_nodes(args):
+    """Compares the 15-puzzle node representations: generation time and memory per node."""
+    print('%-20s %12s %14s' % ('node', 'us / node', 'bytes / node'))
+    input_str = scramble(args.moves, args.seed)
+    for cls in (FifteensNode, PackedFifteensNode):
+        root = cls(input_str=input_str)
+        nodes, elapsed = timed(_expand_all, root, args.operations)
+        del nodes
+        tracemalloc.start()
+        nodes = _expand_all(cls(input_str=input_str), args.operations)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print('%-20s %12.2f %14.0f' % (cls.__name__, 1e6 * elapsed / len(nodes), size / len(nodes)))
+
+
+def bench_parallel(args):
+    """Compares hash-distributed A* with the serial Astar on the 15 puzzle: expansions,
+    time and speedup for every number of workers."""
+    print('%-10s %8s %10s %10s' % ('instance', 'length', 'serial', 's')
+          + ''.join(' %10s %8s %8s' % ('%d workers' % w, 's', 'speedup') for w in args.workers))
+    for i in range(args.instances):
+        input_str = scramble(args.moves, args.seed + i)
+        length, expansions, serial_time = _solve(PackedFifteensNode(input_str=input_str))
+        line = '%-10d %8d %10d %10.3f' % (i, length, expansions, serial_time)
+        for workers in args.workers:
+            stats = SearchStats()
+            _, elapsed = timed(HDAstar, PackedFifteensNode(input_str=input_str), workers=workers, stats=stats)
+            line += ' %10d %8.3f %8.2f' % (stats.expanded, elapsed, serial_time / elapsed)
+        print(line)
+
+
+def bench_memory(args):
+    """Compares the memory-bounded searches with Astar on the 15 puzzle: solution length,
+    expansions and peak number of nodes for every beam width and SMA* node cap."""
+    print('%-10s %-14s %8s %10s %10s %8s' % ('instance', 'search', 'length', 'expanded', 'peak nodes', 's'))
+    for i in range(args.instances):
+        input_str = scramble(args.moves, args.seed + i)
+        searches = [('astar', Astar, {})]
+        searches += [('beam %d' % width, BeamSearch, {'width': width}) for width in args.widths]
+        searches += [('sma* %d' % max_nodes, SMAstar, {'max_nodes': max_nodes}) for max_nodes in args.max_nodes]
+        for name, search, options in searches:
+            stats = SearchStats()
+            try:
+                path = search(PackedFifteensNode(input_str=input_str), stats=stats, time_limit=args.time_limit, **options)
+            except SearchLimitExceeded:
+                length = 'timeout'
+            else:
+                length = '-' if path is None else len(path) - 1
+            # Astar holds the nodes of its fringe and of its closed table
+            peak = stats.peak_nodes or stats.peak_open + stats.peak_closed
+            print('%-10d %-14s %8s %10d %10d %8.3f' % (i, name, length, stats.expanded, peak, stats.time_total))
+
+
+BENCHMARKS = {
+    'batched': bench_batched,
+    'fringe': bench_fringe,
+    'heuristics': bench_heuristics,
+    'memory': bench_memory,
+    'nodes': bench_nodes,
+    'parallel': bench_parallel,
+    'pdb': bench_pdb,
+    'superqueens': bench_superqueens,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--seed', type=int, default=270, help='seed of the generated instances')
+    parser.add_argument('--instances', type=int, default=5, help='number of puzzle instances')
+    parser.add_argument('--moves', type=int, default=24, help='scramble length of the puzzle instances')
+    parser.add_argument('--operations', type=int, default=200000, help='fringe operations in the micro-benchmark')
+    parser.add_argument('--partition', choices=sorted(PARTITIONS), default='5-5-5',
+                        help='pattern database partition')
+    parser.add_argument('--pdb-directory', default='pdb', help='where the pattern databases are stored')
+    parser.add_argument('--min-n', type=int, default=7, help='smallest Superqueens board')
+    parser.add_argument('--max-n', type=int, default=14, help='largest Superqueens board')
+    parser.add_argument('--time-limit', type=float, default=60, help='time limit of a single search in seconds')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 16, 64, 256, 1024],
+                        help='batch sizes of the batched expansion')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='numbers of worker processes of the parallel search')
+    parser.add_argument('--widths', type=int, nargs='+', default=[10, 100, 1000],
+                        help='widths of the beam search')
+    parser.add_argument('--max-nodes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='node caps of SMA*')
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
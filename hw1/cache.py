@@ -0,0 +1,157 @@
+"""A cache of solved states shared by the searches of a problem.
+
+For every state of a solved path, the cache stores the optimal cost from the
+state to the goal and the next state of the path. Astar takes a cache: a
+search then stops expanding at the states found in it and returns as soon as
+no open node can lead to a cheaper solution than a cached one, and it stores
+the states of its solution for the next searches.
+
+The cache has an in-memory LRU tier and an optional sqlite tier on disk, which
+several processes can share. Astar looks every expanded state up in the memory
+tier but only its root in the disk tier, as a query per expansion would slow
+down the searches that miss by about a third. Costs are only exact for a single
+problem and goal, so the states are stored under the `problem_key` of their
+nodes, and problems such as Superqueens boards of several sizes can share a
+cache without mixing their states.
+
+"""
+
+import pickle
+import sqlite3
+from collections import OrderedDict
+
+
+def _key(problem, state):
+    # ints, strings and tuples of them pickle to the same bytes in every process
+    return pickle.dumps((problem, state), 4)
+
+
+class SolutionCache:
+    """The cost to the goal and the next state of the solved states.
+
+    Parameters
+    ----------
+    path : str, optional
+        The sqlite database of the disk tier, created if missing. Default is None,
+        the memory tier only.
+
+    capacity : int, optional
+        The number of states of the memory tier. Default is 100000.
+
+    Attributes
+    ----------
+    lookups : int
+        The number of lookups.
+
+    memory_hits : int
+        The number of lookups answered by the memory tier.
+
+    disk_hits : int
+        The number of lookups answered by the disk tier.
+    """
+
+    def __init__(self, path=None, capacity=100000):
+        self.capacity = capacity
+        self._memory = OrderedDict()
+        self._db = None
+        if path is not None:
+            # the timeout makes concurrent writers wait for each other's transactions
+            self._db = sqlite3.connect(path, timeout=60)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS solutions '
+                             '(state BLOB PRIMARY KEY, distance NOT NULL, next BLOB) WITHOUT ROWID')
+            self._db.commit()
+        self.lookups = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+    @property
+    def hit_rate(self):
+        """The fraction of the lookups answered by either tier."""
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def get(self, problem, state, disk=True):
+        """Returns the optimal cost from the state of the problem, a problem_key of its
+        nodes, to the goal and the next state of a solution, None for the goal, or None
+        if the state is not cached. The disk tier is only searched if disk is True."""
+        self.lookups += 1
+        key = problem, state
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry
+        if not disk:
+            return None
+        entry = self._load(problem, state)
+        if entry is not None:
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def continuation(self, node):
+        """Returns the nodes following the node on its cached solution, down to the
+        goal, or None if the node or a state of its solution is not cached."""
+        problem = node.problem_key()
+        nodes = []
+        while True:
+            entry = self._memory.get((problem, node.state)) or self._load(problem, node.state)
+            if entry is None:
+                return None
+            next_state = entry[1]
+            if next_state is None:
+                return nodes
+            node = next((child for child in node.generate_children() if child.state == next_state), None)
+            if node is None:
+                return None
+            nodes.append(node)
+
+    def store_path(self, path):
+        """Stores every state of an optimal solution path with its cost to the goal."""
+        problem = path[0].problem_key()
+        cost = path[-1].g
+        entries = [(node.state, (cost - node.g, following.state))
+                   for node, following in zip(path, path[1:])]
+        entries.append((path[-1].state, (0, None)))
+        for state, entry in entries:
+            self._remember((problem, state), entry)
+        if self._db is not None:
+            with self._db:
+                self._db.executemany(
+                    'INSERT OR IGNORE INTO solutions VALUES (?, ?, ?)',
+                    [(_key(problem, state), distance, None if next_state is None else pickle.dumps(next_state, 4))
+                     for state, (distance, next_state) in entries])
+
+    def close(self):
+        """Closes the disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __str__(self):
+        return 'lookups=%d, memory_hits=%d, disk_hits=%d, hit_rate=%.4f' % (
+            self.lookups, self.memory_hits, self.disk_hits, self.hit_rate)
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _load(self, problem, state):
+        if self._db is None:
+            return None
+        row = self._db.execute('SELECT distance, next FROM solutions WHERE state = ?',
+                               (_key(problem, state),)).fetchone()
+        if row is None:
+            return None
+        return row[0], None if row[1] is None else pickle.loads(row[1])
@@ -0,0 +1,118 @@
+"""Open-list (fringe) structures used by the search algorithms.
+
+Every fringe stores nodes under an (f, g) priority and pops the node with the
+smallest f, breaking ties in favour of the larger g (the deeper node).
+
+    HeapFringe    a binary heap, works for any numeric f and g.
+    BucketFringe  an array of LIFO buckets indexed by f and g, with O(1) push
+                  and amortised O(1) pop. It requires non-negative integer f
+                  and g, which is the case for unit-cost problems such as the
+                  15 puzzle and for integer conflict counts in Superqueens.
+
+"""
+
+from heapq import heappush, heappop
+from itertools import count
+
+
+class HeapFringe:
+    """Binary heap fringe, a lock-free replacement for queue.PriorityQueue."""
+
+    def __init__(self):
+        self._heap = []
+        self._tie = count()  # insertion counter, so nodes themselves are never compared
+
+    def push(self, f, g, node):
+        """Adds a node with the priority (f, -g)."""
+        heappush(self._heap, (f, -g, next(self._tie), node))
+
+    def pop(self):
+        """Removes and returns the node with the smallest f, preferring larger g."""
+        return heappop(self._heap)[-1]
+
+    def peek_f(self):
+        """Returns the smallest f in the fringe."""
+        return self._heap[0][0]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class BucketFringe:
+    """Bucketed fringe for non-negative integer priorities.
+
+    `_buckets[f][g]` is a list used as a stack, so among nodes with equal f and g
+    the most recently pushed one is popped first. `_min_f` is a lower bound on the
+    smallest non-empty f bucket; it only moves backwards when a node is pushed
+    below it, which does not happen with a consistent heuristic.
+    """
+
+    def __init__(self):
+        self._buckets = []
+        self._sizes = []
+        self._min_f = 0
+        self._size = 0
+
+    def push(self, f, g, node):
+        """Adds a node with the integer priority (f, -g)."""
+        buckets = self._buckets
+        while len(buckets) <= f:
+            buckets.append([])
+            self._sizes.append(0)
+        try:
+            by_g = buckets[f]
+            while len(by_g) <= g:
+                by_g.append([])
+            by_g[g].append(node)
+        except TypeError:
+            raise ValueError("the bucket fringe needs integer priorities, got f=%r and g=%r; "
+                             "use fringe='heap' instead" % (f, g)) from None
+        self._sizes[f] += 1
+        self._size += 1
+        if f < self._min_f:
+            self._min_f = f
+
+    def pop(self):
+        """Removes and returns the node with the smallest f, preferring larger g."""
+        if not self._size:
+            raise IndexError('pop from an empty fringe')
+        f = self._advance()
+        by_g = self._buckets[f]
+        while not by_g[-1]:
+            by_g.pop()
+        self._sizes[f] -= 1
+        self._size -= 1
+        return by_g[-1].pop()
+
+    def peek_f(self):
+        """Returns the smallest f in the fringe."""
+        if not self._size:
+            raise IndexError('peek into an empty fringe')
+        return self._advance()
+
+    def _advance(self):
+        sizes = self._sizes
+        f = self._min_f
+        while not sizes[f]:
+            f += 1
+        self._min_f = f
+        return f
+
+    def __len__(self):
+        return self._size
+
+
+FRINGES = {
+    'heap': HeapFringe,
+    'bucket': BucketFringe,
+}
+
+
+def make_fringe(kind):
+    """Returns a new empty fringe given its name in FRINGES or a fringe class."""
+    if isinstance(kind, str):
+        try:
+            kind = FRINGES[kind]
+        except KeyError:
+            raise ValueError('unknown fringe %r, expected one of %s' % (kind, ', '.join(sorted(FRINGES))))
+    return kind()
@@ -0,0 +1,119 @@
+"""Admissible heuristics for the 15 puzzle, stronger than the Manhattan distance.
+
+Every heuristic is called with the tiles of a board in row-major order and
+estimates the number of moves to the usual goal configuration (the empty cell in
+the lower right corner). They can be passed as the heuristic of FifteensNode and
+PackedFifteensNode. Their lookup tables are built on first use, once per process.
+
+    manhattan           the sum of the distances of the tiles to their goal cells.
+    linear_conflict     the Manhattan distance plus 2 moves for every tile that has to
+                        leave its goal row (column) to let the others pass.
+    walking_distance    the moves needed when only the goal row (column) of the tiles
+                        matters, computed over all rows (columns) at once.
+
+"""
+
+from collections import deque
+from itertools import permutations
+
+from problems import MANHATTAN
+
+SIZE = 4
+CELLS = SIZE * SIZE
+
+_line_conflicts = None
+_walking_distances = None
+
+
+def manhattan(tiles):
+    """Returns the Manhattan distance of the tiles to their goal cells."""
+    distances = MANHATTAN
+    return sum(distances[tile][cell] for cell, tile in enumerate(tiles))
+
+
+def _longest_increasing(values):
+    best = []
+    for i, value in enumerate(values):
+        best.append(1 + max([best[j] for j in range(i) if values[j] < value], default=0))
+    return max(best, default=0)
+
+
+def _build_line_conflicts():
+    # conflicts[line][key], line 0-3 the rows and 4-7 the columns, key the tiles of the
+    # line packed 4 bits each: the number of tiles of the line whose goal is in the line
+    # that have to leave it, i.e. their count minus their longest correctly ordered subsequence
+    conflicts = []
+    for line in range(2 * SIZE):
+        table = bytearray(1 << (4 * SIZE))
+        for tiles in permutations(range(CELLS), SIZE):
+            if line < SIZE:
+                goals = [(tile - 1) % SIZE for tile in tiles if tile and (tile - 1) // SIZE == line]
+            else:
+                goals = [(tile - 1) // SIZE for tile in tiles if tile and (tile - 1) % SIZE == line - SIZE]
+            key = tiles[0] | tiles[1] << 4 | tiles[2] << 8 | tiles[3] << 12
+            table[key] = len(goals) - _longest_increasing(goals)
+        conflicts.append(table)
+    return conflicts
+
+
+def linear_conflict(tiles):
+    """Returns the Manhattan distance plus two moves per tile that must leave its goal line."""
+    global _line_conflicts
+    if _line_conflicts is None:
+        _line_conflicts = _build_line_conflicts()
+    conflicts = _line_conflicts
+    extra = 0
+    for i in range(SIZE):
+        row = 4 * i
+        extra += conflicts[i][tiles[row] | tiles[row + 1] << 4 | tiles[row + 2] << 8 | tiles[row + 3] << 12]
+        extra += conflicts[SIZE + i][tiles[i] | tiles[i + 4] << 4 | tiles[i + 8] << 8 | tiles[i + 12] << 12]
+    return manhattan(tiles) + 2 * extra
+
+
+def _build_walking_distances():
+    # A state counts, for every row i and goal row j, the tiles in row i whose goal row
+    # is j, flattened to 16 counts. The empty cell is in the row holding 3 tiles. A move
+    # takes a tile from a row next to the empty cell into its row. Breadth-first search
+    # from the goal state gives the distance of every reachable state.
+    goal = tuple((SIZE if i == j else 0) - (i == j == SIZE - 1) for i in range(SIZE) for j in range(SIZE))
+    distances = {goal: 0}
+    queue = deque([(goal, SIZE - 1)])
+    while queue:
+        counts, blank = queue.popleft()
+        distance = distances[counts] + 1
+        for row in (blank - 1, blank + 1):
+            if not 0 <= row < SIZE:
+                continue
+            for j in range(SIZE):
+                if counts[row * SIZE + j]:
+                    moved = list(counts)
+                    moved[row * SIZE + j] -= 1
+                    moved[blank * SIZE + j] += 1
+                    moved = tuple(moved)
+                    if moved not in distances:
+                        distances[moved] = distance
+                        queue.append((moved, row))
+    return distances
+
+
+def walking_distance(tiles):
+    """Returns the vertical plus the horizontal walking distance of the tiles."""
+    global _walking_distances
+    if _walking_distances is None:
+        _walking_distances = _build_walking_distances()
+    rows = [0] * CELLS
+    columns = [0] * CELLS
+    for cell, tile in enumerate(tiles):
+        if tile:
+            goal = tile - 1
+            rows[cell - cell % SIZE + goal // SIZE] += 1
+            columns[(cell % SIZE) * SIZE + goal % SIZE] += 1
+    # the goal is symmetric under transposition, so one table serves rows and columns
+    return _walking_distances[tuple(rows)] + _walking_distances[tuple(columns)]
+
+
+HEURISTICS = {
+    'manhattan': manhattan,
+    'linear-conflict': linear_conflict,
+    'walking-distance': walking_distance,
+}
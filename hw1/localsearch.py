@@ -0,0 +1,174 @@
+"""Min-conflicts local search for large Superqueens boards.
+
+Systematic search over SuperqueensNode does not scale to boards with thousands
+of rows, but placements with few or no conflicts are easy to reach by repairing
+a random one. The search keeps one queen per row and per column (a permutation
+of the columns) and moves by swapping the columns of two rows, which keeps the
+placement legal. Counters of the queens on every diagonal and anti-diagonal make
+the change in conflicts of a swap an O(1) computation; knight attacks are looked
+up directly in the permutation.
+
+Example ::
+
+    >>> from localsearch import min_conflicts
+    >>> node = min_conflicts(1000, time_limit=30)
+    >>> node.g  # the number of attacking pairs
+    0
+
+"""
+
+import random
+import time
+
+from problems import SuperqueensNode
+
+KNIGHT_MOVES = ((1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1), (2, -1), (-2, 1), (-2, -1))
+
+
+class _Placement:
+    """A permutation placement with its diagonal counters and total number of conflicts."""
+
+    def __init__(self, columns):
+        n = len(columns)
+        self.n = n
+        self.columns = columns
+        self.diagonals = [0] * (2 * n - 1)  # indexed by row - column + n - 1
+        self.anti_diagonals = [0] * (2 * n - 1)  # indexed by row + column
+        for row, column in enumerate(columns):
+            self.diagonals[row - column + n - 1] += 1
+            self.anti_diagonals[row + column] += 1
+        self.total = sum(k * (k - 1) // 2 for k in self.diagonals + self.anti_diagonals)
+        self.total += sum(self.knights(row) for row in range(n)) // 2
+
+    def knights(self, row):
+        """Returns the number of queens a knight move away from the queen of a row."""
+        columns = self.columns
+        n = self.n
+        column = columns[row]
+        return sum(1 for dx, dy in KNIGHT_MOVES if 0 <= row + dx < n and columns[row + dx] == column + dy)
+
+    def conflicts(self, row):
+        """Returns the number of queens attacking the queen of a row."""
+        n = self.n
+        column = self.columns[row]
+        return (self.diagonals[row - column + n - 1] + self.anti_diagonals[row + column] - 2
+                + self.knights(row))
+
+    def _move(self, row, column, sign):
+        n = self.n
+        self.diagonals[row - column + n - 1] += sign
+        self.anti_diagonals[row + column] += sign
+
+    def swap(self, i, j):
+        """Swaps the columns of two rows, updates the counters and returns the change in conflicts."""
+        columns = self.columns
+        before = self.conflicts(i) + self.conflicts(j) - self._attack(i, j)
+        self._move(i, columns[i], -1)
+        self._move(j, columns[j], -1)
+        columns[i], columns[j] = columns[j], columns[i]
+        self._move(i, columns[i], 1)
+        self._move(j, columns[j], 1)
+        delta = self.conflicts(i) + self.conflicts(j) - self._attack(i, j) - before
+        self.total += delta
+        return delta
+
+    def _attack(self, i, j):
+        # whether the queens of rows i and j attack each other
+        dx = abs(i - j)
+        dy = abs(self.columns[i] - self.columns[j])
+        return int(dx == dy or (dx, dy) in ((1, 2), (2, 1)))
+
+
+def min_conflicts(n, time_limit=10.0, max_steps=None, candidates=64, tabu_tenure=10, patience=None, seed=None):
+    """Searches for a Superqueens placement with few conflicts on an n x n board.
+
+    Every step picks a row whose queen is attacked and swaps it with the best of a
+    sample of other rows, skipping swaps that recently moved one of the two queens
+    (tabu) unless they reach a new best. The search restarts from a new random
+    permutation when the best placement has not improved for `patience` steps.
+
+    Parameters
+    ----------
+    n : int
+        The size of the board.
+
+    time_limit : float, optional
+        The wall time budget in seconds. Default is 10.
+
+    max_steps : int, optional
+        The maximum number of swaps over all restarts. Default is None, no limit.
+
+    candidates : int, optional
+        The number of rows sampled as swap partners at every step. Default is 64.
+
+    tabu_tenure : int, optional
+        The number of steps a moved row stays tabu. Default is 10.
+
+    patience : int, optional
+        The number of steps without improvement before a restart. Default is None, 10 * n.
+
+    seed : int, optional
+        The seed of the random number generator. Default is None.
+
+    Returns
+    -------
+        node : SuperqueensNode
+            The best placement found, a complete node whose g is its number of conflicts.
+    """
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_limit
+    patience = 10 * n if patience is None else patience
+    best_columns, best_total = None, None
+    steps = 0
+
+    while True:
+        columns = list(range(n))
+        rng.shuffle(columns)
+        placement = _Placement(columns)
+        tabu = [0] * n  # the step until which a row may not be moved
+        conflicted = []
+        restart_best = placement.total
+        stale = 0
+        if best_total is None or placement.total < best_total:
+            best_columns, best_total = list(columns), placement.total
+
+        while placement.total and stale < patience:
+            if max_steps is not None and steps >= max_steps:
+                break
+            if not steps & 63 and time.perf_counter() > deadline:
+                break
+            steps += 1
+            stale += 1
+            # the conflicted rows are collected in O(n) only when the previous list is used up
+            while conflicted and not placement.conflicts(conflicted[-1]):
+                conflicted.pop()
+            if not conflicted:
+                conflicted = [row for row in range(n) if placement.conflicts(row)]
+                rng.shuffle(conflicted)
+            i = conflicted.pop()
+
+            best_move, best_delta = None, None
+            for j in rng.sample(range(n), min(candidates, n)):
+                if j == i:
+                    continue
+                delta = placement.swap(i, j)
+                placement.swap(i, j)
+                aspiration = placement.total + delta < best_total
+                if (tabu[i] > steps or tabu[j] > steps) and not aspiration:
+                    continue
+                if best_delta is None or delta < best_delta:
+                    best_move, best_delta = j, delta
+            if best_move is None:
+                continue
+            placement.swap(i, best_move)
+            tabu[i] = tabu[best_move] = steps + tabu_tenure
+            conflicted.append(i)
+            if placement.total < restart_best:
+                restart_best = placement.total
+                stale = 0
+            if placement.total < best_total:
+                best_columns, best_total = list(columns), placement.total
+        if not best_total or time.perf_counter() > deadline or (max_steps is not None and steps >= max_steps):
+            break
+
+    return SuperqueensNode(g=best_total, queen_positions=list(enumerate(best_columns)), n=n)
@@ -28,7 +28,12 @@ class Node(ABC):
     state : tuple
         The hashable representation of the search state of this node.
 
+    The attributes are slots, so subclasses that declare __slots__ too store no
+    per-node __dict__; subclasses that do not declare them get one as usual.
+
     """
+    __slots__ = ('parent', 'g', 'f', 'state')
+
     def __init__(self, parent, g):
         self.parent = parent
         self.g = g
@@ -80,6 +85,79 @@ class Node(ABC):
         """
         pass
 
+    def problem_key(self):
+        """Returns a hashable identity of the problem of this node, the same for all the
+        nodes of a search, so that a cache shared between problems keeps their states
+        apart. The default is the name of the class, problems whose instances share
+        states, e.g. boards of several sizes, override it.
+
+        Returns
+        -------
+            key : hashable
+                The identity of the problem, made of strings, ints and tuples.
+        """
+        return type(self).__name__
+
+    def successors(self):
+        """Generates the children lazily: yields, for every child, its state, its cost g
+        and a move from which `make_child` builds it, so that Astar only builds the
+        children that are not duplicates. The default yields the children of
+        generate_children as their own moves; problems whose states are cheaper to
+        compute than their nodes override both methods.
+
+        Yields
+        ------
+            state, g, move : hashable, int or float, object
+                The state and the cost of a child and the move leading to it.
+        """
+        for child in self.generate_children():
+            yield child.state, child.g, child
+
+    def make_child(self, move):
+        """Builds the child reached by a move yielded by `successors`.
+
+        Parameters
+        ----------
+        move : object
+            The move, as yielded by successors.
+
+        Returns
+        -------
+            child : Node
+                The child node.
+        """
+        return move
+
+    @classmethod
+    def generate_children_batch(cls, nodes):
+        """Expands several nodes at once, as the batched mode of Astar does. The default
+        calls generate_children on every node, problems with a vectorized expansion
+        override it.
+
+        Parameters
+        ----------
+        nodes : list of Nodes
+            The nodes to expand, all of this class and of the same problem.
+
+        Returns
+        -------
+            children : list of lists of Nodes
+                The children of every node, in the order of the nodes.
+        """
+        return [node.generate_children() for node in nodes]
+
+    def is_solvable(self):
+        """Decides cheaply whether a goal state can be reached from this node, so that the
+        search engines return None at once for instances without a solution. The default
+        assumes that it can, problems with a quick test override it.
+
+        Returns
+        -------
+            is_solvable : bool
+                False if no goal state can be reached from this node, True otherwise.
+        """
+        return True
+
     def get_path(self):
         """Returns the path from the start node to this node.
 
@@ -95,3 +173,39 @@ class Node(ABC):
             p = p.parent
 
         return list(reversed(path))
+
+
+class ReversibleNode(Node):
+    """Abstract class of a Node whose problem has a single known goal state and can be
+    searched backwards from it, as needed by bidirectional search.
+
+    A backward search starts at `goal_node()` and expands nodes with
+    `generate_predecessors()`. Its nodes are ordinary nodes of the problem whose
+    goal is the start state: their g is the cost from the goal state, their
+    heuristic estimates the cost back to the start state and `is_goal()` is True
+    at the start state.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def goal_node(self):
+        """Returns the root node of a backward search towards the state of this node.
+
+        Returns
+        -------
+            goal : Node
+                A node of the goal state with g = 0, whose goal is the state of this node.
+        """
+        pass
+
+    @abstractmethod
+    def generate_predecessors(self):
+        """Expands this node of a backward search by generating the nodes of the states
+        from which a single move leads to this state.
+
+        Returns
+        -------
+            predecessors : list of Nodes
+                The list of predecessor nodes, with their g increased by the cost of the move.
+        """
+        pass
@@ -0,0 +1,294 @@
+"""Hash-distributed A* (HDA*): a single search spread over several processes.
+
+Every state is owned by the worker chosen by hashing `node.state`. A worker
+keeps the fringe and the best known g of the states it owns, expands its best
+node and sends the children it does not own to their owners, in batches of
+pickled nodes. Since the workers do not expand in the global order of f, a goal
+only gives an upper bound on the cost, the incumbent, shared by all the workers.
+The search ends when every worker is idle, with no node below the incumbent in
+its fringe, and every sent batch has been received, which the coordinator
+detects by reading the counters of received batches before those of sent ones.
+
+The nodes are sent without their parent, and every worker records the parent
+state of the states it owns, so the path is traced back through the owners of
+its states once the search has ended.
+
+"""
+
+import io
+import multiprocessing
+import pickle
+import queue
+import time
+
+from fringe import make_fringe
+from search import INFINITY, TIMEOUT, SearchLimitExceeded, SearchStats
+
+# the number of expansions between two polls of the inbox and two flushes of the outboxes
+_CHUNK = 64
+
+
+def _owner(state, workers):
+    # Fibonacci hashing spreads states whose hashes differ in a few low bits only,
+    # such as the packed boards of PackedFifteensNode
+    return (((hash(state) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+
+
+def _shared_objects(root):
+    # the attributes a node shares with its children, e.g. the heuristic or the goal,
+    # are pickled as references to the objects each worker already holds
+    names = set(vars(root)) if hasattr(root, '__dict__') else set()
+    for cls in type(root).__mro__:
+        names.update(getattr(cls, '__slots__', ()))
+    names -= {'parent', 'g', 'f', 'state', '__dict__', '__weakref__'}
+    children = root.generate_children()
+    shared = []
+    for name in sorted(names):
+        value = getattr(root, name, None)
+        if value is None or isinstance(value, (bool, int, float, str, bytes)):
+            continue
+        if children and all(getattr(child, name, None) is value for child in children):
+            shared.append(value)
+    return shared
+
+
+class _Pickler(pickle.Pickler):
+
+    def __init__(self, file, shared_ids):
+        super(_Pickler, self).__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._shared_ids = shared_ids
+
+    def persistent_id(self, obj):
+        return self._shared_ids.get(id(obj))
+
+
+class _Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, shared):
+        super(_Unpickler, self).__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        return self._shared[pid]
+
+
+def HDAstar(root, workers=None, fringe='heap', batch_size=64, stats=None, time_limit=None):
+    """Runs hash-distributed A* in worker processes given the root node and returns
+    an optimal solution as a path from the start node to the goal node, or None if
+    there's no solution, like Astar.
+
+    The nodes must be picklable and their states must hash the same way in every
+    process, as ints and tuples of ints do. Strings are only safe with the fork start
+    method or a fixed PYTHONHASHSEED.
+
+    Parameters
+    ----------
+    root: Node
+        The start node of the problem to be solved.
+
+    workers: int, optional
+        The number of worker processes. Default is None, the number of CPUs.
+
+    fringe: str, optional
+        The fringe of every worker, as in Astar. Default is 'heap'.
+
+    batch_size: int, optional
+        The number of nodes per message between two workers. Default is 64.
+
+    stats: SearchStats, optional
+        Receives the expansions and generations summed over the workers, and the wall time.
+
+    time_limit: float, optional
+        The maximum wall time in seconds. Default is None, no limit.
+
+    Returns
+    -------
+        path: list of Nodes or None
+            The solution, a path from the initial node to the goal node.
+            If there is no solution it should return None
+
+    Raises
+    ------
+        SearchLimitExceeded
+            If the time limit is reached before the search ends.
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers < 1:
+        raise ValueError('the number of workers must be positive, got %r' % workers)
+    if stats is None:
+        stats = SearchStats()
+    if not root.is_solvable():
+        return None
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    incumbent = context.Value('d', INFINITY)
+    # every counter and flag is written by its worker only
+    sent = context.Array('q', workers, lock=False)
+    received = context.Array('q', workers, lock=False)
+    idle = context.Array('b', workers, lock=False)
+    root_bytes = pickle.dumps(root, pickle.HIGHEST_PROTOCOL)
+    processes = [
+        context.Process(target=_worker, args=(index, workers, root_bytes, inboxes, results, incumbent,
+                                              sent, received, idle, fringe, batch_size), daemon=True)
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        while not _terminated(idle, sent, received):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise SearchLimitExceeded('ran for more than %g s' % time_limit, TIMEOUT)
+            if not all(process.is_alive() for process in processes):
+                raise RuntimeError('a worker process exited before the end of the search')
+            time.sleep(0.001)
+
+        goal_state = None
+        goal_g = INFINITY
+        for inbox in inboxes:
+            inbox.put(('report',))
+        for _ in range(workers):
+            _, expanded, generated, reopened, g, state = results.get()
+            stats.expanded += expanded
+            stats.generated += generated
+            stats.reopened += reopened
+            if g < goal_g:
+                goal_g, goal_state = g, state
+
+        if goal_state is None:
+            return None
+        states = [goal_state]
+        while True:
+            inboxes[_owner(states[-1], workers)].put(('trace', states[-1]))
+            parent_state = results.get()
+            if parent_state is None:
+                break
+            states.append(parent_state)
+        return _rebuild(root, states[::-1])
+    finally:
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for process in processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+        stats.time_total += time.perf_counter() - start
+
+
+def _terminated(idle, sent, received):
+    # the counters only grow and a batch is counted as sent before it is received, so if
+    # the received batches, read first, equal the sent ones, read last, none was in flight
+    # or sent in between; a worker only leaves the idle state on receiving a batch, so the
+    # workers idle in between stay idle
+    received = sum(received)
+    return all(idle) and sum(sent) == received
+
+
+def _rebuild(root, states):
+    # the nodes of the path, regenerated from the root with their parents and costs
+    path = [root]
+    for state in states[1:]:
+        path.append(min((child for child in path[-1].generate_children() if child.state == state),
+                        key=lambda child: child.g))
+    return path
+
+
+def _worker(index, workers, root_bytes, inboxes, results, incumbent, sent, received, idle, fringe, batch_size):
+    root = pickle.loads(root_bytes)
+    shared = _shared_objects(root)
+    shared_ids = {id(value): i for i, value in enumerate(shared)}
+    inbox = inboxes[index]
+    fringe = make_fringe(fringe)
+    best_g = {}
+    parents = {}
+    outboxes = [[] for _ in range(workers)]
+    goal = None
+    expanded = generated = reopened = 0
+
+    def receive(node, parent_state):
+        state = node.state
+        g = best_g.get(state)
+        if g is None or node.g < g:
+            if g is not None:
+                # a cheaper path found by another worker reaches a state seen before
+                nonlocal reopened
+                reopened += 1
+            best_g[state] = node.g
+            parents[state] = parent_state
+            fringe.push(node.f, node.g, node)
+
+    def flush(owner):
+        buffer = io.BytesIO()
+        _Pickler(buffer, shared_ids).dump(outboxes[owner])
+        outboxes[owner] = []
+        sent[index] += 1
+        inboxes[owner].put(buffer.getvalue())
+
+    if _owner(root.state, workers) == index:
+        receive(root, None)
+
+    while True:
+        try:
+            message = inbox.get(timeout=0.01) if idle[index] else inbox.get_nowait()
+        except queue.Empty:
+            message = None
+        if isinstance(message, bytes):
+            idle[index] = 0
+            for node, parent_state in _Unpickler(io.BytesIO(message), shared).load():
+                receive(node, parent_state)
+            received[index] += 1
+            continue
+        if message is not None:
+            if message[0] == 'report':
+                results.put((index, expanded, generated, reopened,
+                             INFINITY if goal is None else goal.g, None if goal is None else goal.state))
+            elif message[0] == 'trace':
+                results.put(parents[message[1]])
+            else:
+                # the batches left in the queues are dropped instead of blocking the exit
+                for inbox in inboxes:
+                    inbox.cancel_join_thread()
+                return
+            continue
+
+        bound = incumbent.value
+        for _ in range(_CHUNK):
+            if not fringe or fringe.peek_f() >= bound:
+                break
+            node = fringe.pop()
+            state = node.state
+            if node.g > best_g[state]:
+                continue  # a stale entry
+            if node.is_goal():
+                with incumbent.get_lock():
+                    if node.g < incumbent.value:
+                        incumbent.value = node.g
+                if goal is None or node.g < goal.g:
+                    goal = node
+                bound = incumbent.value
+                continue
+            expanded += 1
+            children = node.generate_children()
+            generated += len(children)
+            for child in children:
+                if child.f >= bound:
+                    continue
+                # the parent is recorded by state, so the nodes do not drag their ancestors along
+                child.parent = None
+                owner = _owner(child.state, workers)
+                if owner == index:
+                    receive(child, state)
+                else:
+                    outboxes[owner].append((child, state))
+                    if len(outboxes[owner]) >= batch_size:
+                        flush(owner)
+
+        for owner, outbox in enumerate(outboxes):
+            if outbox:
+                flush(owner)
+        if not fringe or fringe.peek_f() >= incumbent.value:
+            idle[index] = 1
@@ -0,0 +1,235 @@
+"""Additive disjoint pattern databases for the 15 puzzle.
+
+A pattern database stores, for every placement of a subset of the tiles (the
+pattern), the minimum number of moves of those tiles needed to bring them to
+their goal cells, ignoring the other tiles. Moves of the empty cell through
+non-pattern cells are free, so the tables of disjoint patterns can be added
+and the sum is still an admissible heuristic.
+
+The tables are built by a backward 0-1 breadth-first search from the goal and
+are stored one byte per entry, so they can be saved to disk and memory-mapped by
+every solver process instead of being rebuilt. Building is pure Python: the
+5-5-5 partition takes a few minutes, the 6-6-3 partition much longer.
+
+Example ::
+
+    python patterndb.py build --partition 5-5-5 --directory pdb
+    >>> from patterndb import AdditivePDB
+    >>> from problems import FifteensNode
+    >>> root = FifteensNode(input_str=input_str, heuristic=AdditivePDB.load('pdb'))
+
+"""
+
+import argparse
+import mmap
+import os
+from collections import deque
+from math import perm
+
+from problems import GOAL_CELLS, MANHATTAN, PACKED_NEIGHBOURS
+
+try:
+    import numpy as np
+except ImportError:  # only the batched lookups need it
+    np = None
+
+CELLS = 16
+UNKNOWN = 255
+
+PARTITIONS = {
+    '5-5-5': ((1, 5, 6, 9, 13), (2, 3, 4, 7, 8), (10, 11, 12, 14, 15)),
+    '6-6-3': ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)),
+}
+
+
+def rank(cells):
+    """Returns the index of an ordered placement of distinct cells among all
+    CELLS! / (CELLS - k)! placements of k cells (a falling factorial numbering).
+    """
+    index = 0
+    used = 0
+    for i, cell in enumerate(cells):
+        index = index * (CELLS - i) + cell - bin(used & ((1 << cell) - 1)).count('1')
+        used |= 1 << cell
+    return index
+
+
+class PatternDatabase:
+    """The table of one pattern.
+
+    Parameters
+    ----------
+    pattern : tuple of int
+        The tiles of the pattern.
+
+    table : bytes-like
+        One byte per placement of the pattern tiles, indexed by `rank` of their cells.
+
+    path : str, optional
+        The file the table was loaded from, if any. Default is None.
+    """
+
+    def __init__(self, pattern, table, path=None):
+        self.pattern = tuple(pattern)
+        self.table = table
+        self.path = path
+        self._array = None  # the NumPy view of the table, made by the first batch
+
+    @classmethod
+    def build(cls, pattern):
+        """Builds the table of a pattern by a 0-1 breadth-first search from the goal.
+
+        A search state is the placement of the pattern tiles plus the empty cell.
+        Moving a pattern tile costs 1, moving the empty cell over another cell is free.
+        """
+        pattern = tuple(pattern)
+        k = len(pattern)
+        size = perm(CELLS, k)
+        # distances of the (placement, empty cell) states, indexed by rank * CELLS + empty cell
+        distances = bytearray([UNKNOWN]) * (size * CELLS)
+
+        start = tuple(GOAL_CELLS[tile] for tile in pattern)
+        blank = GOAL_CELLS[0]
+        distances[rank(start) * CELLS + blank] = 0
+        queue = deque([(start, blank, 0)])
+        while queue:
+            cells, blank, distance = queue.popleft()
+            if distance > distances[rank(cells) * CELLS + blank]:
+                continue  # reached again at a smaller distance
+            for cell in PACKED_NEIGHBOURS[blank]:
+                if cell in cells:
+                    moved = tuple(blank if c == cell else c for c in cells)
+                    cost = distance + 1
+                else:
+                    moved = cells
+                    cost = distance
+                index = rank(moved) * CELLS + cell
+                if cost < distances[index]:
+                    distances[index] = cost
+                    if cost == distance:
+                        queue.appendleft((moved, cell, cost))
+                    else:
+                        queue.append((moved, cell, cost))
+
+        table = bytearray(size)
+        for i in range(size):
+            table[i] = min(distances[i * CELLS:(i + 1) * CELLS])
+        return cls(pattern, table)
+
+    def save(self, path):
+        """Writes the table to a file, one byte per entry."""
+        with open(path, 'wb') as f:
+            f.write(self.table)
+        self.path = path
+
+    @classmethod
+    def load(cls, path, pattern):
+        """Memory-maps a table written by save, so processes share its pages."""
+        with open(path, 'rb') as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(table) != perm(CELLS, len(pattern)):
+            raise ValueError('%s does not hold a table of the pattern %s' % (path, pattern))
+        return cls(pattern, table, path)
+
+    def __call__(self, where):
+        """Returns the table entry given the cell of every tile, where[tile] = cell."""
+        return self.table[rank([where[tile] for tile in self.pattern])]
+
+    def batch(self, where):
+        """Returns the table entries of several boards at once given a 2-D NumPy array of
+        the cells of the tiles of every board, where[board, tile] = cell."""
+        cells = where[:, list(self.pattern)]
+        k = len(self.pattern)
+        # the rank of every board, as in `rank`: each cell counts the earlier cells below it
+        earlier = np.tril(np.ones((k, k), dtype=bool), -1)
+        below = ((cells[:, None, :] < cells[:, :, None]) & earlier).sum(axis=2)
+        weights = np.array([perm(CELLS - i - 1, k - i - 1) for i in range(k)], dtype=np.int64)
+        if self._array is None:
+            self._array = np.frombuffer(self.table, dtype=np.uint8)
+        return self._array[((cells - below) * weights).sum(axis=1)]
+
+    def __reduce__(self):
+        # memory-mapped tables are pickled by path, e.g. to be sent to worker processes
+        if self.path is None:
+            return (PatternDatabase, (self.pattern, bytes(self.table)))
+        return (PatternDatabase.load, (self.path, self.pattern))
+
+
+class AdditivePDB:
+    """Heuristic summing the pattern databases of a disjoint partition of the tiles.
+
+    It is called with the tiles of a board in row-major order, as in `node.state`
+    of FifteensNode, and can be passed as the heuristic of FifteensNode and
+    PackedFifteensNode. Tiles that are in no pattern add their Manhattan distance.
+
+    Parameters
+    ----------
+    databases : list of PatternDatabase
+        The databases of disjoint patterns.
+    """
+
+    def __init__(self, databases):
+        self.databases = list(databases)
+        tiles = [tile for database in self.databases for tile in database.pattern]
+        if len(tiles) != len(set(tiles)) or 0 in tiles:
+            raise ValueError('the patterns must be disjoint and must not contain the empty cell')
+        self.uncovered = tuple(tile for tile in range(1, CELLS) if tile not in tiles)
+
+    @classmethod
+    def build(cls, partition='5-5-5'):
+        """Builds the databases of a partition, given by name in PARTITIONS or as tile groups."""
+        if isinstance(partition, str):
+            partition = PARTITIONS[partition]
+        return cls(PatternDatabase.build(pattern) for pattern in partition)
+
+    def save(self, directory):
+        """Writes one file per database into a directory."""
+        os.makedirs(directory, exist_ok=True)
+        for database in self.databases:
+            database.save(os.path.join(directory, _file_name(database.pattern)))
+
+    @classmethod
+    def load(cls, directory, partition='5-5-5'):
+        """Memory-maps the databases of a partition saved in a directory."""
+        if isinstance(partition, str):
+            partition = PARTITIONS[partition]
+        return cls(PatternDatabase.load(os.path.join(directory, _file_name(pattern)), pattern)
+                   for pattern in partition)
+
+    def __call__(self, tiles):
+        where = [0] * CELLS
+        for cell, tile in enumerate(tiles):
+            where[tile] = cell
+        distances = MANHATTAN
+        return (sum(database(where) for database in self.databases)
+                + sum(distances[tile][where[tile]] for tile in self.uncovered))
+
+    def batch(self, tiles):
+        """Returns the heuristic of several boards at once given a 2-D NumPy array of their
+        tiles in row-major order, one board per row. Used by the batched expansion of
+        PackedFifteensNode."""
+        # the tiles of a board are a permutation of the cells, so sorting inverts it
+        where = np.argsort(tiles, axis=1)
+        total = sum(database.batch(where).astype(np.int64) for database in self.databases)
+        if self.uncovered:
+            uncovered = list(self.uncovered)
+            distances = np.array(MANHATTAN, dtype=np.int64)[uncovered]
+            total = total + np.take_along_axis(distances, where[:, uncovered].T, axis=1).sum(axis=0)
+        return total
+
+
+def _file_name(pattern):
+    return 'pdb-%s.bin' % '-'.join(str(tile) for tile in pattern)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Builds the pattern databases of the 15 puzzle.')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--partition', choices=sorted(PARTITIONS), default='5-5-5')
+    parser.add_argument('--directory', default='pdb', help='where the tables are written')
+    args = parser.parse_args(argv)
+    AdditivePDB.build(args.partition).save(args.directory)
+
+
+if __name__ == '__main__':
+    main()
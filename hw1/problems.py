@@ -1,6 +1,12 @@
-from node import Node
+from node import Node, ReversibleNode
 
-from copy import deepcopy
+import math
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # the batched expansion falls back to generate_children
+    np = None
 
 # helper functions
 def getXY(board, val):
@@ -11,8 +17,157 @@ def getXY(board, val):
     return None
 
 
-class FifteensNode(Node):
-    """Extends the Node class to solve the 15 puzzle.
+def pack_board(board, bits=4):
+    """Packs a board into an integer, bits per cell in row-major order. A 4x4 board
+    fits in 64 bits."""
+    packed = 0
+    for i, tile in enumerate(n for row in board for n in row):
+        packed |= tile << (i * bits)
+    return packed
+
+
+def unpack_board(packed, size=4, bits=4):
+    """Unpacks an integer produced by pack_board into a size x size board."""
+    mask = (1 << bits) - 1
+    return [[(packed >> ((size * x + y) * bits)) & mask for y in range(size)] for x in range(size)]
+
+
+def permutation_parity(tiles, cells):
+    """Returns the parity of the permutation moving every tile to its cell, cells[tile],
+    from its position in tiles, 0 if even and 1 if odd. Computed in O(len(tiles)) by
+    counting the cycles of the permutation."""
+    seen = [False] * len(tiles)
+    parity = 0
+    for start in range(len(tiles)):
+        if seen[start]:
+            continue
+        cell = start
+        length = 0
+        while not seen[cell]:
+            seen[cell] = True
+            cell = cells[tiles[cell]]
+            length += 1
+        parity ^= (length - 1) & 1
+    return parity
+
+
+class Goal:
+    """A goal configuration of an N x N sliding puzzle (the 8, 15 or 24 puzzle) and
+    the tables derived from it. Nodes share the Goal of their root, so the tables are
+    computed once per search, and `standard_goal` computes the usual goal once per size.
+
+    Parameters
+    ----------
+    board : list of lists
+        The goal configuration, a square board of the values 0, ..., N * N - 1.
+
+    Attributes
+    ----------
+    board : list of lists
+        The goal configuration.
+
+    tiles : tuple of int
+        The goal configuration in row-major order, the state of a goal node.
+
+    size : int
+        The number of rows and columns N.
+
+    cells : tuple of int
+        The goal cell (row-major index) of every tile, cells[tile] = cell.
+
+    distances : tuple of tuples
+        The Manhattan distance of every tile from every cell to its goal cell,
+        distances[tile][cell]. The empty cell does not count.
+
+    neighbours : tuple of tuples
+        For every cell, the cells the empty cell can move to.
+
+    bits : int
+        The bits per cell of the packed boards: 4 up to the 15 puzzle, 5 for the 24 puzzle.
+
+    packed : int
+        The goal configuration packed by pack_board.
+    """
+
+    def __init__(self, board):
+        self.board = [list(row) for row in board]
+        size = self.size = len(board)
+        tiles = [n for row in board for n in row]
+        self.tiles = tuple(tiles)
+        self.cells = tuple(tiles.index(tile) for tile in range(size * size))
+        self.distances = tuple(
+            tuple(abs(goal // size - cell // size) + abs(goal % size - cell % size) if tile else 0
+                  for cell in range(size * size))
+            for tile, goal in enumerate(self.cells)
+        )
+        self.neighbours = tuple(
+            tuple(c for c, ok in ((i - size, i >= size), (i + size, i < size * size - size),
+                                  (i - 1, i % size > 0), (i + 1, i % size < size - 1)) if ok)
+            for i in range(size * size)
+        )
+        self.bits = max(4, (size * size - 1).bit_length())
+        self.packed = pack_board(board, self.bits)
+
+    def is_solvable(self, board):
+        """Decides whether the goal can be reached from the board.
+
+        A move swaps the empty cell with a neighbour, so it changes both the parity
+        of the permutation of the cells and the parity of the Manhattan distance of
+        the empty cell from its goal cell. The goal can be reached exactly when the
+        two parities are equal, for boards of any size.
+
+        Parameters
+        ----------
+        board : list of lists
+            A board of the size of the goal.
+
+        Returns
+        -------
+            is_solvable : bool
+                True if the goal can be reached from the board, False otherwise.
+        """
+        size = self.size
+        tiles = [n for row in board for n in row]
+        blank = tiles.index(0)
+        goal_blank = self.cells[0]
+        distance = abs(blank // size - goal_blank // size) + abs(blank % size - goal_blank % size)
+        return permutation_parity(tiles, self.cells) == distance & 1
+
+
+@lru_cache(maxsize=None)
+def standard_goal(size):
+    """Returns the Goal of the size x size puzzle with the tiles in order and the empty
+    cell in the lower right corner. Cached per size."""
+    tiles = list(range(1, size * size)) + [0]
+    return Goal([tiles[i:i + size] for i in range(0, size * size, size)])
+
+
+@lru_cache(maxsize=None)
+def _batch_tables(goal):
+    # the NumPy tables of the batched expansion of PackedFifteensNode: the Manhattan
+    # distances, for every move direction the cell the empty cell moves to from every
+    # cell (-1 if it cannot), and the shifts of the cells of a packed board
+    size = goal.size
+    cells = np.arange(size * size)
+    targets = [np.where(ok, cells + step, -1) for step, ok in (
+        (-size, cells >= size), (size, cells < size * size - size),
+        (-1, cells % size > 0), (1, cells % size < size - 1))]
+    shifts = (cells * goal.bits).astype(np.uint64)
+    return np.array(goal.distances, dtype=np.int64), targets, shifts
+
+
+GOAL = standard_goal(4)
+GOAL_CELLS = GOAL.cells
+MANHATTAN = GOAL.distances
+PACKED_GOAL = GOAL.packed
+
+# for each cell, the cells the empty cell can move to
+PACKED_NEIGHBOURS = GOAL.neighbours
+
+
+class FifteensNode(ReversibleNode):
+    """Extends the Node class to solve the 15 puzzle, and the other N x N sliding
+    puzzles such as the 8 and the 24 puzzle.
 
     Parameters
     ----------
@@ -25,7 +180,8 @@ class FifteensNode(Node):
         It is optional only if the input_str is provided. Default is 0.
 
     board : list of lists
-        The two-dimensional list that describes the state. It is a 4x4 array of values 0, ..., 15.
+        The two-dimensional list that describes the state. It is a 4x4 array of values 0, ..., 15,
+        or an N x N array of values 0, ..., N * N - 1 for the other puzzles.
         It is optional only if the input_str is provided. Default is None.
 
     input_str : str
@@ -33,6 +189,31 @@ class FifteensNode(Node):
         The argument 'board' will be ignored, if input_str is provided.
         Example: input_str = '1 2 3 4\n5 6 7 8\n9 10 0 11\n13 14 15 12' # 0 represents the empty cell
 
+    h : int, optional
+        The heuristic value of the board if already known, e.g. computed incrementally
+        from the parent. Default is None, which evaluates it from the board.
+
+    heuristic : callable, optional
+        A heuristic called with the tiles of the board in row-major order, e.g. a
+        `patterndb.AdditivePDB`. Children inherit it. Default is None, which uses the
+        Manhattan distance.
+
+    goal : Goal, optional
+        The goal configuration. Children inherit it. Default is None, which is the
+        usual configuration of the size of the board, with the empty cell in the lower
+        right corner.
+
+    tiles : tuple of int, optional
+        The board in row-major order, instead of board. Default is None.
+
+    blank : int, optional
+        The row-major index of the empty cell, if already known. Default is None.
+
+    The node has a fixed slot layout without a __dict__. It stores the tiles in
+    row-major order, which are its state, and the index of the empty cell, which
+    for a child is the move taken from the parent, but not the board: `board` is
+    rebuilt from the tiles on demand, e.g. by `__str__` and for the nodes of a path.
+
     Examples
     ----------
     Initialization with an input string (Only the first/root construction call should be formatted like this):
@@ -53,23 +234,40 @@ class FifteensNode(Node):
 
     """
 
-    def __init__(self, parent=None, g=0, board=None, input_str=None):
+    __slots__ = ('h', 'blank', 'heuristic', 'goal')
+
+    def __init__(self, parent=None, g=0, board=None, input_str=None, h=None, heuristic=None, goal=None,
+                 tiles=None, blank=None):
         # NOTE: You shouldn't modify the constructor
+        self.h = h
+        self.heuristic = heuristic
         if input_str:
-            self.board = []
+            board = []
             for i, line in enumerate(filter(None, input_str.splitlines())):
-                self.board.append([int(n) for n in line.split()])
-        else:
-            self.board = board
-
-        self.goal_board = [
-            [1, 2, 3, 4],
-            [5, 6, 7, 8],
-            [9, 10, 11, 12],
-            [13, 14, 15, 0]
-        ]
+                board.append([int(n) for n in line.split()])
+        if tiles is None:
+            tiles = tuple([n for row in board for n in row])
+        if goal is None:
+            goal = GOAL if len(tiles) == 16 else standard_goal(math.isqrt(len(tiles)))
+        self.goal = goal
+        self.blank = tiles.index(0) if blank is None else blank
+        # the state is needed by evaluate_heuristic, before Node sets it
+        self.state = tiles
+
         super(FifteensNode, self).__init__(parent, g)
 
+    @property
+    def board(self):
+        """The two-dimensional list of the board, rebuilt from the tiles."""
+        tiles = self.state
+        size = self.goal.size
+        return [list(tiles[i:i + size]) for i in range(0, size * size, size)]
+
+    @property
+    def goal_board(self):
+        """The goal configuration, shared with the other nodes of the search."""
+        return self.goal.board
+
     def generate_children(self):
         """Generates children by trying all 4 possible moves of the empty cell.
 
@@ -79,60 +277,60 @@ class FifteensNode(Node):
                 The list of child nodes.
         """
 
-        # TODO: add your code here
-        # You should use self.board to produce children. Don't forget to create a new board for each child
-        # e.g you can use copy.deepcopy function from the standard library.
-        board = self.board
-        row_len = len(board)
-        col_len = len(board[0])
-        [x, y] = getXY(board, 0)  # get x and y values of empty cell
+        # switch the empty cell with the cell above, below, left and right
+        return [self.make_child(cell) for cell in self.goal.neighbours[self.blank]]
 
-        children = []
+    def problem_key(self):
+        """Returns the identity of the problem, the class and the goal configuration.
 
-        # creating boards and nodes
+        Returns
+        -------
+            key : tuple
+                The name of the class and the goal tiles.
+        """
+        return type(self).__name__, self.goal.tiles
 
-        # add board by switching empty cell with...
-        # right cell
-        if x > 0:
-            # make copy of board
-            new_board = deepcopy(board)
-            temp = new_board[x][y]
-            new_board[x][y] = new_board[x - 1][y]
-            new_board[x - 1][y] = temp
+    def successors(self):
+        """Yields the state, the cost and the move of every child, in the order of
+        generate_children, without building the children. The move is the cell the
+        empty cell moves to.
 
-            new_node = FifteensNode(self, self.g + 1, new_board)
-            children.append(new_node)
-        # left cell
-        if x < row_len - 1:
-            # make copy of board
-            new_board = deepcopy(board)
-            temp = new_board[x][y]
-            new_board[x][y] = new_board[x + 1][y]
-            new_board[x + 1][y] = temp
-
-            new_node = FifteensNode(self, self.g + 1, new_board)
-            children.append(new_node)
-        # above cell
-        if y > 0:
-            # make copy of board
-            new_board = deepcopy(board)
-            temp = new_board[x][y]
-            new_board[x][y] = new_board[x][y - 1]
-            new_board[x][y - 1] = temp
-
-            new_node = FifteensNode(self, self.g + 1, new_board)
-            children.append(new_node)
-        # below cell
-        if y < col_len - 1:
-            # make copy of board
-            new_board = deepcopy(board)
-            temp = new_board[x][y]
-            new_board[x][y] = new_board[x][y + 1]
-            new_board[x][y + 1] = temp
-
-            new_node = FifteensNode(self, self.g + 1, new_board)
-            children.append(new_node)
-        return children
+        Yields
+        ------
+            state, g, move : tuple, int, int
+                The state and the cost of a child and the move leading to it.
+        """
+        tiles = list(self.state)
+        blank = self.blank
+        g = self.g + 1
+        for cell in self.goal.neighbours[blank]:
+            tiles[blank] = tiles[cell]
+            tiles[cell] = 0
+            yield tuple(tiles), g, cell
+            tiles[cell] = tiles[blank]
+            tiles[blank] = 0
+
+    def make_child(self, move):
+        """Builds the child in which the empty cell moved to the cell move, see successors.
+
+        Returns
+        -------
+            child : FifteensNode
+                The child node.
+        """
+        blank = self.blank
+        tiles = list(self.state)
+        tile = tiles[move]
+        tiles[blank] = tile
+        tiles[move] = 0
+        # only the moved tile changes its distance to the goal
+        if self.heuristic is None:
+            tile_distances = self.goal.distances[tile]
+            new_h = self.evaluate_heuristic() + tile_distances[blank] - tile_distances[move]
+        else:
+            new_h = None
+        return self.__class__(self, self.g + 1, h=new_h, heuristic=self.heuristic, goal=self.goal,
+                              tiles=tuple(tiles), blank=move)
 
     def is_goal(self):
         """Decides whether this search state is the final state of the puzzle.
@@ -143,9 +341,19 @@ class FifteensNode(Node):
                 True if this search state is the goal state, False otherwise.
         """
 
-        # TODO: add your code here
-        # You should use self.board to decide.
-        return self.board == self.goal_board
+        # The tiles are compared rather than the boards, which are not stored.
+        return self.state == self.goal.tiles
+
+    def is_solvable(self):
+        """Decides whether the goal can be reached from the board by the parity of the
+        board, see Goal.is_solvable.
+
+        Returns
+        -------
+            is_solvable : bool
+                True if the goal can be reached from the board, False otherwise.
+        """
+        return self.goal.is_solvable(self.board)
 
     def evaluate_heuristic(self):
         """Heuristic function h(n) that estimates the minimum number of moves
@@ -159,19 +367,16 @@ class FifteensNode(Node):
 
         # h = hueristic
         # the total number of moves each indiv. tile may need
-        # to get to its correct spot
-        h = 0
-        board = self.board
-        for i in range(len(board)):
-            for j in range(len(board[0])):
-                if board[i][j] == 0:
-                    continue
-                # get coordinates of actual value
-                [x, y] = getXY(self.goal_board, board[i][j])
-                # add min # of moves to move a single tile to its
-                # correct spot to hueristic
-                h += abs(x - i) + abs(y - j)
-        return h
+        # to get to its correct spot. Children get it incrementally from
+        # their parent, see generate_children.
+        if self.h is None:
+            tiles = self.state
+            if self.heuristic is None:
+                distances = self.goal.distances
+                self.h = sum(distances[tile][cell] for cell, tile in enumerate(tiles))
+            else:
+                self.h = self.heuristic(tiles)
+        return self.h
 
     def _get_state(self):
         """Returns an hashable representation of this search state.
@@ -181,8 +386,8 @@ class FifteensNode(Node):
             state: tuple
                 The hashable representation of the search state
         """
-        # NOTE: You shouldn't modify this method.
-        return tuple([n for row in self.board for n in row])
+        # the tiles in row-major order, set by the constructor
+        return self.state
 
     def __str__(self):
         """Returns the string representation of this node.
@@ -206,6 +411,27 @@ class FifteensNode(Node):
             sb.append('\n')
         return ''.join(sb)
 
+    def goal_node(self):
+        """Returns the root of a backward search: a node of the goal configuration whose own
+        goal is the board of this node.
+
+        Returns
+        -------
+            goal : FifteensNode
+                The node of the goal configuration.
+        """
+        return self.__class__(board=[row[:] for row in self.goal.board], goal=Goal(self.board))
+
+    def generate_predecessors(self):
+        """Moves of the empty cell are their own inverse, so the predecessors are the children.
+
+        Returns
+        -------
+            predecessors : list of Nodes
+                The list of predecessor nodes.
+        """
+        return self.generate_children()
+
     def visited(self, child, visited):
         new_board = child.board
         # path = self.get_path()
@@ -222,6 +448,310 @@ class FifteensNode(Node):
         return self.f < other.f
 
 
+class PackedFifteensNode(ReversibleNode):
+    """Extends the Node class to solve the 15 puzzle with a compact bitboard state.
+
+    The board is packed into a single 64-bit integer with 4 bits per cell, the
+    cell at row-major index i = 4 * x + y occupying bits 4i to 4i + 3. Other N x N
+    puzzles use goal.bits bits per cell, 5 for the 24 puzzle. The empty
+    cell holds 0, and its index is kept alongside so that a move is a couple of
+    shifts and masks. The packed integer is the state, so it is used directly as
+    the hash key by the search.
+
+    The node has a fixed slot layout without a __dict__: besides the Node
+    attributes it holds the packed board, the index of the empty cell (which for
+    a child is the move taken from the parent), h and references to the shared
+    heuristic and goal. `board` and the string representation are rebuilt from
+    the packed board on demand.
+
+    Parameters
+    ----------
+    parent : Node, optional
+        The parent node. Default is None.
+
+    g : int or float, optional
+        The number of moves to reach this node from the initial configuration. Default is 0.
+
+    packed : int, optional
+        The packed board. It is optional only if board or input_str is provided.
+
+    blank : int, optional
+        The row-major index of the empty cell in the packed board. Required with packed.
+
+    board : list of lists, optional
+        A board as used by FifteensNode, packed on construction.
+
+    input_str : str, optional
+        The input string to be parsed to create the board, in the format of FifteensNode.
+
+    h : int, optional
+        The heuristic value of the board if already known. Default is None.
+
+    heuristic : callable, optional
+        A heuristic called with the tiles in row-major order, see FifteensNode.
+        Default is None, which uses the Manhattan distance.
+
+    goal : Goal, optional
+        The goal configuration, see FifteensNode. Default is None, the usual 4x4
+        configuration or, given a board, the usual configuration of its size.
+
+    Examples
+    ----------
+    >>> n = PackedFifteensNode(input_str='1 2 3 4\n5 6 7 8\n9 10 0 11\n13 14 15 12')
+    >>> n.state == pack_board(n.board)
+    True
+
+    """
+
+    __slots__ = ('packed', 'blank', 'h', 'heuristic', 'goal')
+
+    def __init__(self, parent=None, g=0, packed=None, blank=None, board=None, input_str=None, h=None,
+                 heuristic=None, goal=None):
+        self.h = h
+        self.heuristic = heuristic
+        if input_str:
+            board = [[int(n) for n in line.split()] for line in filter(None, input_str.splitlines())]
+        if goal is None:
+            goal = GOAL if board is None or len(board) == 4 else standard_goal(len(board))
+        self.goal = goal
+        if board is not None:
+            packed = pack_board(board, goal.bits)
+            blank = [n for row in board for n in row].index(0)
+        self.packed = packed
+        self.blank = blank
+        super(PackedFifteensNode, self).__init__(parent, g)
+
+    @property
+    def board(self):
+        """The list of lists representation of the packed board."""
+        return unpack_board(self.packed, self.goal.size, self.goal.bits)
+
+    def generate_children(self):
+        """Generates children by trying all 4 possible moves of the empty cell.
+
+        Returns
+        -------
+            children : list of Nodes
+                The list of child nodes.
+        """
+        packed = self.packed
+        blank = self.blank
+        goal = self.goal
+        bits = goal.bits
+        mask = (1 << bits) - 1
+        shift = blank * bits
+        h = self.evaluate_heuristic()
+        distances = goal.distances
+        heuristic = self.heuristic
+        cls = self.__class__
+        children = []
+        for cell in goal.neighbours[blank]:
+            tile = (packed >> (cell * bits)) & mask
+            # the empty cell holds 0, so moving a tile is a subtraction and an addition
+            child = packed - (tile << (cell * bits)) + (tile << shift)
+            new_h = h + distances[tile][blank] - distances[tile][cell] if heuristic is None else None
+            children.append(cls(self, self.g + 1, child, cell, h=new_h, heuristic=heuristic, goal=goal))
+        return children
+
+    def problem_key(self):
+        """Returns the identity of the problem, the class and the goal configuration.
+
+        Returns
+        -------
+            key : tuple
+                The name of the class and the goal tiles.
+        """
+        return type(self).__name__, self.goal.tiles
+
+    def successors(self):
+        """Yields the packed board, the cost and the move of every child, in the order
+        of generate_children, without building the children. The move is the cell the
+        empty cell moves to.
+
+        Yields
+        ------
+            state, g, move : int, int, int
+                The state and the cost of a child and the move leading to it.
+        """
+        packed = self.packed
+        goal = self.goal
+        bits = goal.bits
+        mask = (1 << bits) - 1
+        shift = self.blank * bits
+        g = self.g + 1
+        for cell in goal.neighbours[self.blank]:
+            tile = (packed >> (cell * bits)) & mask
+            yield packed - (tile << (cell * bits)) + (tile << shift), g, cell
+
+    def make_child(self, move):
+        """Builds the child in which the empty cell moved to the cell move, see successors.
+
+        Returns
+        -------
+            child : PackedFifteensNode
+                The child node.
+        """
+        packed = self.packed
+        blank = self.blank
+        goal = self.goal
+        bits = goal.bits
+        tile = (packed >> (move * bits)) & ((1 << bits) - 1)
+        child = packed - (tile << (move * bits)) + (tile << (blank * bits))
+        if self.heuristic is None:
+            new_h = self.evaluate_heuristic() + goal.distances[tile][blank] - goal.distances[tile][move]
+        else:
+            new_h = None
+        return self.__class__(self, self.g + 1, child, move, h=new_h, heuristic=self.heuristic, goal=goal)
+
+    @classmethod
+    def generate_children_batch(cls, nodes):
+        """Generates the children of several nodes at once with NumPy: the packed
+        boards of the children and their Manhattan distances are computed for the
+        whole batch, as are the heuristics that have a `batch` method taking a 2-D
+        array of tiles, e.g. `patterndb.AdditivePDB`. Other heuristics are called
+        per child. Without NumPy, or for boards that do not fit in 64 bits, it calls
+        generate_children on every node.
+
+        Parameters
+        ----------
+        nodes : list of PackedFifteensNodes
+            The nodes to expand, sharing their goal and heuristic.
+
+        Returns
+        -------
+            children : list of lists of Nodes
+                The children of every node, in the order of generate_children.
+        """
+        goal = nodes[0].goal
+        if np is None or goal.bits * goal.size ** 2 > 64:
+            return [node.generate_children() for node in nodes]
+        heuristic = nodes[0].heuristic
+        distances, targets, shifts = _batch_tables(goal)
+        mask = np.uint64((1 << goal.bits) - 1)
+        bits = goal.bits
+        packed = np.fromiter((node.packed for node in nodes), np.uint64, len(nodes))
+        blanks = np.fromiter((node.blank for node in nodes), np.int64, len(nodes))
+        h = np.fromiter((node.evaluate_heuristic() for node in nodes), np.int64, len(nodes))
+        children = [[] for _ in nodes]
+        # one direction at a time, so the children of every node come in the order of generate_children
+        for target in targets:
+            cells = target[blanks]
+            index = np.flatnonzero(cells >= 0)
+            cells = cells[index]
+            blank = blanks[index]
+            parents = packed[index]
+            cell_shifts = (cells * bits).astype(np.uint64)
+            tiles = (parents >> cell_shifts) & mask
+            boards = parents - (tiles << cell_shifts) + (tiles << (blank * bits).astype(np.uint64))
+            if heuristic is None:
+                tiles = tiles.astype(np.int64)
+                child_h = (h[index] + distances[tiles, blank] - distances[tiles, cells]).tolist()
+            else:
+                all_tiles = ((boards[:, None] >> shifts) & mask).astype(np.int64)
+                if hasattr(heuristic, 'batch'):
+                    child_h = heuristic.batch(all_tiles).tolist()
+                else:
+                    child_h = [heuristic(row) for row in all_tiles.tolist()]
+            for i, board, cell, child in zip(index.tolist(), boards.tolist(), cells.tolist(), child_h):
+                node = nodes[i]
+                children[i].append(cls(node, node.g + 1, board, cell, h=child, heuristic=heuristic, goal=goal))
+        return children
+
+    def is_goal(self):
+        """Decides whether this search state is the final state of the puzzle.
+
+        Returns
+        -------
+            is_goal : bool
+                True if this search state is the goal state, False otherwise.
+        """
+        return self.packed == self.goal.packed
+
+    def is_solvable(self):
+        """Decides whether the goal can be reached from the board, see Goal.is_solvable.
+
+        Returns
+        -------
+            is_solvable : bool
+                True if the goal can be reached from the board, False otherwise.
+        """
+        return self.goal.is_solvable(self.board)
+
+    def evaluate_heuristic(self):
+        """Manhattan distance of the tiles to their goal cells, or the heuristic given on construction.
+
+        Returns
+        -------
+            h : int or float
+                The heuristic value for this state.
+        """
+        if self.h is None:
+            packed = self.packed
+            bits = self.goal.bits
+            mask = (1 << bits) - 1
+            tiles = [(packed >> (cell * bits)) & mask for cell in range(self.goal.size ** 2)]
+            if self.heuristic is None:
+                distances = self.goal.distances
+                self.h = sum(distances[tile][cell] for cell, tile in enumerate(tiles))
+            else:
+                self.h = self.heuristic(tiles)
+        return self.h
+
+    def _get_state(self):
+        """Returns the packed board, which is hashable.
+
+        Returns
+        -------
+            state: int
+                The hashable representation of the search state
+        """
+        return self.packed
+
+    def goal_node(self):
+        """Returns a node of the goal configuration whose own goal is the board of this node.
+
+        Returns
+        -------
+            goal : PackedFifteensNode
+                The node of the goal configuration.
+        """
+        return self.__class__(board=self.goal.board, goal=Goal(self.board))
+
+    def generate_predecessors(self):
+        """Moves of the empty cell are their own inverse, so the predecessors are the children.
+
+        Returns
+        -------
+            predecessors : list of Nodes
+                The list of predecessor nodes.
+        """
+        return self.generate_children()
+
+    __str__ = FifteensNode.__str__
+
+    def __lt__(self, other):
+        return self.f < other.f
+
+
+@lru_cache(maxsize=None)
+def superqueen_attacks(n):
+    """Returns, for every square i = n * row + column of an n x n board, the bitmask of the
+    squares a superqueen on it attacks along diagonals or with a knight move. Rows and
+    columns are left out as Superqueens placements never share them. Cached per n.
+    """
+    attacks = []
+    for x in range(n):
+        for y in range(n):
+            mask = 0
+            for x1 in range(n):
+                for y1 in range(n):
+                    dx, dy = abs(x - x1), abs(y - y1)
+                    if (dx == dy and dx) or (dx, dy) in ((1, 2), (2, 1)):
+                        mask |= 1 << (n * x1 + y1)
+            attacks.append(mask)
+    return tuple(attacks)
+
+
 class SuperqueensNode(Node):
     """Extends the Node class to solve the Superqueens problem.
 
@@ -248,6 +778,19 @@ class SuperqueensNode(Node):
     n : int
         The size of the board (n x n)
 
+    columns : int, optional
+        The bitmask of the columns holding a queen. Default is None, which derives it from queen_positions.
+
+    occupied : int, optional
+        The bitmask of the squares holding a queen, square i = n * row + column.
+        Default is None, which derives it from queen_positions.
+
+    break_symmetry : bool, optional
+        Whether to search only one of every pair of placements mirrored left to right,
+        which have the same conflicts: the first queen is restricted to the left half
+        of its row and the state is the smaller of the placement and its mirror image.
+        Children inherit it. Default is False.
+
     Examples
     ----------
     Initialization with a board size (Only the first/root construction call should be formatted like this):
@@ -268,10 +811,19 @@ class SuperqueensNode(Node):
 
     """
 
-    def __init__(self, parent=None, g=0, queen_positions=[], n=1):
+    def __init__(self, parent=None, g=0, queen_positions=[], n=1, columns=None, occupied=None,
+                 break_symmetry=False):
         # NOTE: You shouldn't modify the constructor
         self.queen_positions = queen_positions
         self.n = n
+        self.break_symmetry = break_symmetry
+        if columns is None or occupied is None:
+            columns = occupied = 0
+            for x, y in queen_positions:
+                columns |= 1 << y
+                occupied |= 1 << (n * x + y)
+        self.columns = columns
+        self.occupied = occupied
         super(SuperqueensNode, self).__init__(parent, g)
 
     def generate_children(self):
@@ -282,25 +834,33 @@ class SuperqueensNode(Node):
             children : list of Nodes
                 The list of child nodes.
         """
-        # TODO: add your code here
-        # You should use self.queen_positions and self.n to produce children.
-        # Don't forget to create a new queen_positions list for each child.
-        # You can use copy.deepcopy function from the standard library.
         children = []
         queens = self.queen_positions
+        n = self.n
         x = len(queens)
 
         # return no children if past board limit
-        if x >= self.n:
+        if x >= n:
             return []
 
-        for i in range(self.n):
-            if self.can_add_queen((x, i)):
-                new_queens = deepcopy(queens)
-                new_queens.append((x, i))
-                conflicts = self.conflicts((x, i))
-                new_node = SuperqueensNode(self, self.g + conflicts, new_queens, self.n)
-                children.append(new_node)
+        attacks = superqueen_attacks(n)
+        columns = self.columns
+        occupied = self.occupied
+        break_symmetry = self.break_symmetry
+        cls = self.__class__
+        free = ~columns & ((1 << n) - 1)
+        if break_symmetry and x == 0:
+            free &= (1 << (n + 1) // 2) - 1  # the mirror images start in the right half
+        while free:
+            bit = free & -free  # lowest free column
+            free ^= bit
+            i = bit.bit_length() - 1
+            square = n * x + i
+            # the queens attacked by the new one are the set bits of occupied & attacks
+            conflicts = (occupied & attacks[square]).bit_count()
+            new_node = cls(self, self.g + conflicts, queens + [(x, i)], n, columns | bit, occupied | 1 << square,
+                           break_symmetry)
+            children.append(new_node)
         return children
 
     def is_goal(self):
@@ -319,17 +879,42 @@ class SuperqueensNode(Node):
         # print(self)
         return len(self.queen_positions) == self.n
 
+    def problem_key(self):
+        """Returns the identity of the problem, the class and the size of the board, since
+        the partial placements of boards of different sizes share their states.
+
+        Returns
+        -------
+            key : tuple
+                The name of the class and n.
+        """
+        return type(self).__name__, self.n
+
     def evaluate_heuristic(self):
         """Heuristic function h(n) that estimates the minimum number of conflicts required to reach the final state.
 
+        Every remaining row gets a queen in a free column, which conflicts at least with
+        the placed queens attacking that square. The sum over the remaining rows of the
+        smallest such count is a lower bound, as conflicts among the new queens only add
+        to it. It is also consistent: placing a queen adds exactly its count to g, at
+        least its row's minimum, and can only raise the minima of the other rows.
+
         Returns
         -------
             h : int or float
                 The heuristic value for this state.
         """
-        # If you want to design a heuristic for this problem, you should use self.queen_positions and self.n.
-        # TODO: add your code here (optional)
-        return 0
+        n = self.n
+        occupied = self.occupied
+        if not occupied or len(self.queen_positions) == n:
+            return 0
+        attacks = superqueen_attacks(n)
+        free = [i for i in range(n) if not self.columns >> i & 1]
+        h = 0
+        for x in range(len(self.queen_positions), n):
+            row = n * x
+            h += min((occupied & attacks[row + i]).bit_count() for i in free)
+        return h
 
     def _get_state(self):
         """Returns an hashable representation of this search state.
@@ -340,26 +925,19 @@ class SuperqueensNode(Node):
                 The hashable representation of the search state
         """
         # NOTE: You shouldn't modify this method.
-        return tuple(self.queen_positions)
+        state = tuple(self.queen_positions)
+        if self.break_symmetry:
+            last = self.n - 1
+            mirror = tuple((x, last - y) for x, y in state)
+            return min(state, mirror)
+        return state
 
     def conflicts(self, new_queen):
-        queens = self.queen_positions
-        output = 0
         [x, y] = new_queen
-        for queen in queens:
-            [x1, y1] = queen
-            if (abs(x - x1) + abs(y - y1)) == 3:
-                output += 1
-            if abs(x - x1) == abs(y - y1):
-                output += 1
-        return output
+        return (self.occupied & superqueen_attacks(self.n)[self.n * x + y]).bit_count()
 
     def can_add_queen(self, new_queen):
-        queens = self.queen_positions
-        for queen in queens:
-            if queen[1] == new_queen[1]:
-                return False
-        return True
+        return not self.columns >> new_queen[1] & 1
 
     def __str__(self):
         """Returns the string representation of this node.
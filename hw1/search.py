@@ -8,65 +8,1238 @@ solve different problems.
 
 """
 
-from queue import PriorityQueue
+import asyncio
+import copy
+import heapq
+import itertools
+import threading
+import time
+from functools import partial
 
-def Astar(root):
+from fringe import BucketFringe, make_fringe
+
+INFINITY = float('inf')
+
+# the statuses of a SearchResult
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+TIMEOUT = 'timeout'
+EXPANSION_LIMIT = 'expansion_limit'
+OPEN_LIMIT = 'open_limit'
+CANCELLED = 'cancelled'
+
+
+class SearchLimitExceeded(Exception):
+    """Raised when a search runs out of its budget or is cancelled.
+
+    Attributes
+    ----------
+    status : str
+        TIMEOUT, EXPANSION_LIMIT, OPEN_LIMIT or CANCELLED.
+
+    best_f : int or float
+        The largest f of an expanded node, a lower bound on the solution cost when
+        the heuristic is consistent.
+
+    deepest : Node
+        The expanded node with the largest g.
+    """
+
+    def __init__(self, message, status=None, best_f=None, deepest=None):
+        super(SearchLimitExceeded, self).__init__(message)
+        self.status = status
+        self.best_f = best_f
+        self.deepest = deepest
+
+
+class Budget:
+    """The limits of a search. A limit of None means no limit.
+
+    Parameters
+    ----------
+    time_limit : float, optional
+        The maximum wall time in seconds.
+
+    max_expansions : int, optional
+        The maximum number of expanded nodes.
+
+    max_open : int, optional
+        The maximum number of fringe entries, which bounds the memory of the search.
+    """
+
+    def __init__(self, time_limit=None, max_expansions=None, max_open=None):
+        self.time_limit = time_limit
+        self.max_expansions = max_expansions
+        self.max_open = max_open
+
+
+class CancellationToken:
+    """A flag another thread sets to stop a search. The search checks it every
+    1024 expansions, together with its clock."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Asks the searches holding this token to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """Whether cancel was called."""
+        return self._event.is_set()
+
+
+class SearchResult:
+    """The outcome of `solve`.
+
+    Attributes
+    ----------
+    status : str
+        SOLVED, UNSOLVABLE (the search space was exhausted), TIMEOUT, EXPANSION_LIMIT,
+        OPEN_LIMIT or CANCELLED.
+
+    path : list of Nodes or None
+        The solution if the status is SOLVED.
+
+    stats : SearchStats
+        The statistics of the search.
+
+    best_f : int or float or None
+        The largest f of an expanded node, a lower bound on the solution cost when the
+        heuristic is consistent.
+
+    deepest : Node or None
+        The expanded node with the largest g.
+    """
+
+    def __init__(self, status, path, stats, best_f=None, deepest=None):
+        self.status = status
+        self.path = path
+        self.stats = stats
+        self.best_f = best_f
+        self.deepest = deepest
+
+    def __repr__(self):
+        return 'SearchResult(status=%r, length=%s, best_f=%r)' % (
+            self.status, None if self.path is None else len(self.path) - 1, self.best_f)
+
+
+class SearchStats:
+    """Statistics filled in by a search.
+
+    Attributes
+    ----------
+    expanded : int
+        The number of nodes expanded, i.e. whose children were generated.
+
+    generated : int
+        The number of child nodes generated.
+
+    duplicates : int
+        The number of generated children dropped because their state was already
+        reached at a cost that is not larger, plus the stale fringe entries skipped.
+
+    reopened : int
+        The number of closed states re-opened by a cheaper path.
+
+    peak_open : int
+        The largest number of entries in the fringe.
+
+    peak_closed : int
+        The largest number of expanded states.
+
+    peak_nodes : int
+        The largest number of nodes held at once by the memory-bounded searches,
+        BeamSearch and SMAstar.
+
+    time_total : float
+        The wall time of the search in seconds.
+
+    time_children : float
+        The time spent generating the children, including their heuristic.
+        Only measured when profiling.
+
+    time_heuristic : float
+        The time spent in evaluate_heuristic. Only measured when profiling.
+
+    time_fringe : float
+        The time spent pushing to and popping from the fringe. Only measured when profiling.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.peak_nodes = 0
+        self.time_total = 0.0
+        self.time_children = 0.0
+        self.time_heuristic = 0.0
+        self.time_fringe = 0.0
+
+    @property
+    def expansions_per_second(self):
+        """The number of expansions per second of wall time."""
+        return self.expanded / self.time_total if self.time_total else 0.0
+
+    def as_dict(self):
+        """Returns the statistics as a dict, e.g. to be dumped as JSON."""
+        stats = dict(vars(self))
+        stats['expansions_per_second'] = self.expansions_per_second
+        return stats
+
+    def __str__(self):
+        return ', '.join('%s=%s' % (k, round(v, 6) if isinstance(v, float) else v) for k, v in self.as_dict().items())
+
+
+def print_path(path, stats=None):
+    """A reporter printing every node of the solution path and its f, then the statistics."""
+    for node in path or []:
+        print(node)
+        print(node.f)
+    if stats is not None:
+        print(stats)
+
+
+def Astar(root, fringe='heap', stats=None, max_expansions=None, time_limit=None, on_expand=None,
+          reporter=None, profile=False, weight=1, max_open=None, token=None, cache=None, batch_size=None):
     """Runs the A* algorithm given the root node. The class of the root node
     defines the problem that's being solved. The algorithm either returns the solution
     as a path from the start node to the goal node or returns None if there's no solution.
 
+    The closed set is a dict keyed on `node.state` that stores the cost g at
+    which each state was expanded. The fringe is paired with a table of the best
+    known g per state, so entries superseded by a cheaper path are skipped when
+    they are popped (lazy deletion) instead of being searched for and removed.
+    If a cheaper path to an already expanded state is found, the state is
+    re-opened. A root whose `is_solvable()` is False returns None without a search.
+    Astar runs `IncrementalAstar` to the end.
+
     Parameters
     ----------
     root: Node
         The start node of the problem to be solved.
 
+    fringe: str or class, optional
+        The open-list structure, a name from `fringe.FRINGES` or a fringe class.
+        'heap' (default) works for any costs; 'bucket' is faster but requires
+        non-negative integer f and g values. Default is 'heap'.
+
+    stats: SearchStats, optional
+        If given, it is filled in with the statistics of this search. Default is None.
+
+    max_expansions: int, optional
+        The maximum number of nodes to expand. Default is None, no limit.
+
+    time_limit: float, optional
+        The maximum wall time of the search in seconds. Default is None, no limit.
+
+    on_expand: callable, optional
+        Called as on_expand(node, stats) before every expansion. Default is None.
+
+    reporter: callable, optional
+        Called as reporter(path, stats) when the search ends, e.g. `print_path`.
+        Default is None, nothing is reported.
+
+    profile: bool, optional
+        Whether to measure the time spent in generate_children, evaluate_heuristic and
+        the fringe operations. It slows the search down, and the solution starts at a
+        copy of the root. Default is False.
+
+    weight: int or float, optional
+        Runs weighted A*, ordering the fringe by g + weight * h. With an admissible
+        heuristic the solution costs at most weight times the optimal cost. The
+        bucket fringe needs an integer weight. Default is 1, plain A*.
+
+    max_open: int, optional
+        The maximum number of fringe entries. Default is None, no limit.
+
+    token: CancellationToken, optional
+        A token whose cancellation stops the search. Default is None.
+
+    cache: SolutionCache, optional
+        The solved states of previous searches, see cache.py. The expanded states found in it are
+        not expanded further, and the search returns once no open node can lead to a
+        cheaper solution than a cached one. Unweighted searches store their solution
+        in it. Default is None.
+
+    batch_size: int, optional
+        Expands the best batch_size open nodes at once with the generate_children_batch
+        of the node class, which evaluates the heuristic of all their children together,
+        e.g. with NumPy for PackedFifteensNode. A goal is only returned once no open node
+        can lead to a cheaper one, so the solution is still optimal. It does not go with
+        profile or cache. Default is None, one node at a time.
+
     Returns
     -------
         path: list of Nodes or None
             The solution, a path from the initial node to the goal node.
             If there is no solution it should return None
+
+    Raises
+    ------
+        SearchLimitExceeded
+            If a limit is reached or the token is cancelled before the search ends.
+            See `solve` for a variant returning a status instead.
     """
+    for progress in IncrementalAstar(root, fringe, stats, max_expansions, time_limit, on_expand,
+                                     profile, weight, max_open, token, cache, batch_size, report_every=None):
+        pass
+    if reporter is not None:
+        reporter(progress.path, progress.stats)
+    return progress.path
+
+
+class SearchProgress:
+    """A snapshot of a running search, yielded by `IncrementalAstar`.
+
+    Attributes
+    ----------
+    expanded : int
+        The number of expanded nodes so far.
+
+    generated : int
+        The number of generated children so far.
+
+    f_bound : int or float or None
+        The largest f of an expanded node. With a consistent heuristic every state
+        with a smaller f has been expanded, so it is a lower bound on the solution cost.
+
+    open_size : int
+        The number of entries in the fringe, stale ones included.
+
+    closed_size : int
+        The number of expanded states.
+
+    stats : SearchStats
+        The statistics of the search, updated as it runs.
+
+    done : bool
+        Whether the search has ended. Only the last snapshot is done.
+
+    path : list of Nodes or None
+        The solution, only set on the last snapshot.
+    """
+
+    def __init__(self, stats, f_bound, open_size, closed_size, done=False, path=None):
+        self.expanded = stats.expanded
+        self.generated = stats.generated
+        self.f_bound = f_bound
+        self.open_size = open_size
+        self.closed_size = closed_size
+        self.stats = stats
+        self.done = done
+        self.path = path
+
+    def __repr__(self):
+        return 'SearchProgress(expanded=%d, f_bound=%r, open_size=%d, done=%r)' % (
+            self.expanded, self.f_bound, self.open_size, self.done)
+
+
+def IncrementalAstar(root, fringe='heap', stats=None, max_expansions=None, time_limit=None, on_expand=None,
+                     profile=False, weight=1, max_open=None, token=None, cache=None, batch_size=None,
+                     report_every=1024):
+    """Runs A* step by step: a generator yielding a SearchProgress every report_every
+    expansions and a last one, with done set, holding the solution path or None.
+
+    The search only advances while the generator is consumed, so callers can
+    interleave several searches, throttle them or stop one by closing the generator
+    (or simply dropping it). The time limit is wall time and so includes the pauses
+    between the steps, whereas stats.time_total only counts the time spent searching.
+
+    Parameters
+    ----------
+    report_every: int or None, optional
+        The number of expansions between two snapshots. Default is 1024.
+        With None, only the last snapshot is yielded.
 
-    # TODO: add your code here
-    # Some helper pseudo-code:
-    # 1. Create an empty fringe and add your root node (you can use lists, sets, heaps, ... )
-    # 2. While the container is not empty:
-    # 3.      Pop the best? node (Use the attribute `node.f` in comparison)
-    # 4.      If that's a goal node, return node.get_path()
-    # 5.      Otherwise, add the children of the node to the fringe
-    # 6. Return None
-    #
-    # Some notes:
-    # You can access the state of a node by `node.state`. (You may also want to store evaluated states)
-    # You should consider the states evaluated and the ones in the fringe to avoid repeated calculation in 5. above.
-    # You can compare two node states by node1.state == node2.state
-    queue = PriorityQueue()
-    visited=[]
-
-    queue.put((root.f, root))
-
-    while not queue.empty():
-        element = queue.get()  # tuple of (weight, child)
-        current= element[1]
-        if current._get_state() not in visited:
-            visited.append(current._get_state())
+    The other parameters are those of `Astar`.
+
+    Yields
+    ------
+        progress: SearchProgress
+            A snapshot of the search.
+
+    Raises
+    ------
+        SearchLimitExceeded
+            If a limit is reached or the token is cancelled before the search ends.
+    """
+    if weight < 1:
+        raise ValueError('the weight must be at least 1, got %r' % weight)
+    if weight == int(weight):
+        weight = int(weight)  # integral weights keep integer priorities, e.g. for the bucket fringe
+    elif fringe in ('bucket', BucketFringe):
+        raise ValueError("the bucket fringe needs an integer weight, got %r; use fringe='heap' instead" % weight)
+    if report_every is not None and report_every < 1:
+        raise ValueError('report_every must be positive, got %r' % report_every)
+    if stats is None:
+        stats = SearchStats()
+    budget = Budget(time_limit, max_expansions, max_open)
+    if batch_size is not None:
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive, got %r' % batch_size)
+        if profile or cache is not None:
+            raise ValueError('the batched expansion does not go with profile or cache')
+        yield from _timed_steps(_batched_astar(root, fringe, stats, budget, token, on_expand, weight,
+                                               report_every, batch_size), stats)
+    elif profile:
+        profiled_root = _timing_heuristic(root, stats)
+        profiled = type(profiled_root)
+        for progress in _timed_steps(_astar(profiled_root, fringe, stats, budget, token, on_expand, profile, weight,
+                                            cache, report_every), stats):
+            # the solution is made of nodes of the class of the root again
+            for node in progress.path or ():
+                if type(node) is profiled:
+                    node.__class__ = type(root)
+            yield progress
+    else:
+        yield from _timed_steps(_astar(root, fringe, stats, budget, token, on_expand, profile, weight,
+                                       cache, report_every), stats)
+
+
+def _timed_steps(steps, stats):
+    # adds the time spent inside the generator, not the pauses between the steps, to time_total
+    while True:
+        start = time.perf_counter()
+        try:
+            progress = next(steps)
+        except StopIteration:
+            return
+        finally:
+            stats.time_total += time.perf_counter() - start
+        yield progress
+
+
+class _AstarSearch:
+    """The state shared by the A* loops: the fringe with lazy deletion, the best g of
+    every reached state, the closed states, the budget and the progress bookkeeping."""
+
+    def __init__(self, root, fringe, stats, budget, token, on_expand, profile, weight, report_every):
+        self.fringe = make_fringe(fringe)
+        self.stats = stats
+        self.best_g = {root.state: root.g}
+        self.closed = {}
+        self.time_limit = budget.time_limit
+        self.expansion_limit = INFINITY if budget.max_expansions is None else budget.max_expansions
+        self.open_limit = INFINITY if budget.max_open is None else budget.max_open
+        self.deadline = None if budget.time_limit is None else time.perf_counter() + budget.time_limit
+        self.token = token
+        self.on_expand = on_expand
+        self.weight = weight
+        self.best_f = None
+        self.deepest = root
+        self.report_every = report_every
+        self.next_report = INFINITY if report_every is None else report_every
+        self.peak_open = 1
+        self._push, self._pop = self.fringe.push, self.fringe.pop
+        if profile:
+            self._push, self._pop = _timed(self._push, stats, 'time_fringe'), _timed(self._pop, stats, 'time_fringe')
+        self._push(root.g + weight * (root.f - root.g), root.g, root)
+
+    def push(self, node):
+        """Pushes a node whose g is the smallest known for its state, re-opening the state
+        if it was closed."""
+        state = node.state
+        self.best_g[state] = node.g
+        if self.closed.pop(state, None) is not None:
+            self.stats.reopened += 1  # re-open on a cheaper path
+        if self.weight == 1:
+            self._push(node.f, node.g, node)
+        else:
+            self._push(node.g + self.weight * (node.f - node.g), node.g, node)
+
+    def pop(self):
+        """Pops the best node of the fringe, or returns None for a stale entry."""
+        current = self._pop()
+        state = current.state
+        if current.g > self.best_g[state] or state in self.closed:
+            # a stale entry: a cheaper path to this state was pushed later,
+            # or it was already expanded at this cost through another entry
+            self.stats.duplicates += 1
+            return None
+        return current
+
+    def close(self, current):
+        """Checks the budget and the token before the expansion of current, then records
+        the expansion and closes its state."""
+        stats = self.stats
+        if stats.expanded >= self.expansion_limit:
+            raise SearchLimitExceeded('expanded %d nodes' % stats.expanded, EXPANSION_LIMIT, self.best_f,
+                                      self.deepest)
+        if len(self.fringe) >= self.open_limit:
+            raise SearchLimitExceeded('the fringe holds %d entries' % len(self.fringe), OPEN_LIMIT, self.best_f,
+                                      self.deepest)
+        # reading the clock and the token is cheap but not free, check them every 1024 expansions
+        if not stats.expanded & 1023:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchLimitExceeded('ran for more than %g s' % self.time_limit, TIMEOUT, self.best_f,
+                                          self.deepest)
+            if self.token is not None and self.token.cancelled:
+                raise SearchLimitExceeded('cancelled', CANCELLED, self.best_f, self.deepest)
+        if self.on_expand is not None:
+            self.on_expand(current, stats)
+        stats.expanded += 1
+        if self.best_f is None or current.f > self.best_f:
+            self.best_f = current.f
+        if current.g > self.deepest.g:
+            self.deepest = current
+        self.closed[current.state] = current.g
+
+    def progress(self):
+        """Records the size of the fringe after an expansion step and returns a snapshot
+        if report_every expansions were made since the last one, None otherwise."""
+        size = len(self.fringe)
+        if size > self.peak_open:
+            self.peak_open = size
+        expanded = self.stats.expanded
+        if expanded < self.next_report:
+            return None
+        # a batch may expand several report periods at once
+        self.next_report += self.report_every * ((expanded - self.next_report) // self.report_every + 1)
+        return SearchProgress(self.stats, self.best_f, size, len(self.closed))
+
+    def done(self, path):
+        """Records the peak sizes and returns the final snapshot with the solution path."""
+        stats = self.stats
+        stats.peak_open = max(stats.peak_open, self.peak_open)
+        stats.peak_closed = max(stats.peak_closed, len(self.closed))
+        return SearchProgress(stats, self.best_f, len(self.fringe), len(self.closed), True, path)
+
+
+def _astar(root, fringe, stats, budget, token, on_expand, profile, weight, cache, report_every):
+    if not root.is_solvable():
+        yield SearchProgress(stats, None, 0, 0, True)
+        return
+    search = _AstarSearch(root, fringe, stats, budget, token, on_expand, profile, weight, report_every)
+    fringe = search.fringe
+    best_g = search.best_g
+    # the best solution through a cached state and its cost
+    incumbent = None
+    incumbent_cost = INFINITY
+    problem = None if cache is None else root.problem_key()
+
+    while fringe:
+        if incumbent is not None and fringe.peek_f() >= incumbent_cost:
+            break  # no open node leads to a cheaper solution
+        current = search.pop()
+        if current is None:
+            continue
+
+        if current.is_goal():
+            path = current.get_path()
+            if cache is not None and weight == 1:
+                cache.store_path(path)
+            yield search.done(path)
+            return
+
+        search.close(current)
+        if cache is not None:
+            entry = cache.get(problem, current.state, current is root)
+            if entry is not None:
+                # the cached cost is optimal, so no cheaper solution goes through the children
+                if current.g + entry[0] >= incumbent_cost:
+                    continue
+                continuation = cache.continuation(current)
+                if continuation is not None:
+                    incumbent = current.get_path() + continuation
+                    incumbent_cost = incumbent[-1].g
+                    continue
+                # the rest of the cached solution was evicted, the node is expanded as usual
+        if profile:
+            tick = time.perf_counter()
+            fringe_time = stats.time_fringe
+        # the children are only built once they pass the duplicate detection
+        for child_state, child_g, move in current.successors():
+            stats.generated += 1
+            if child_g >= best_g.get(child_state, INFINITY):
+                stats.duplicates += 1
+                continue
+            search.push(current.make_child(move))
+        if profile:
+            stats.time_children += time.perf_counter() - tick - (stats.time_fringe - fringe_time)
+        progress = search.progress()
+        if progress is not None:
+            yield progress
+
+    if incumbent is not None and weight == 1:
+        cache.store_path(incumbent)
+    yield search.done(incumbent)
+
+
+def _batched_astar(root, fringe, stats, budget, token, on_expand, weight, report_every, batch_size):
+    # _astar expanding batch_size nodes at a time; a goal popped in a batch becomes the
+    # incumbent, as the children of the nodes popped before it may lead to a cheaper goal
+    if not root.is_solvable():
+        yield SearchProgress(stats, None, 0, 0, True)
+        return
+    search = _AstarSearch(root, fringe, stats, budget, token, on_expand, False, weight, report_every)
+    fringe = search.fringe
+    best_g = search.best_g
+    incumbent = None
+    incumbent_cost = INFINITY
+    expand = type(root).generate_children_batch
+
+    while fringe:
+        batch = []
+        while fringe and len(batch) < batch_size and fringe.peek_f() < incumbent_cost:
+            current = search.pop()
+            if current is None:
+                continue
             if current.is_goal():
-                for node in current.get_path():
-                    print(node)
-                    print(node.f)
-                return current.get_path()
-            for child in current.generate_children():
-                if child._get_state() not in visited:
-                    queue.put((child.f, child))
+                if current.g < incumbent_cost:
+                    incumbent, incumbent_cost = current, current.g
+                continue
+            search.close(current)
+            batch.append(current)
+        if not batch:
+            break  # no open node leads to a cheaper goal than the incumbent
+
+        for children in expand(batch):
+            stats.generated += len(children)
+            for child in children:
+                if child.g >= best_g.get(child.state, INFINITY):
+                    stats.duplicates += 1
+                    continue
+                search.push(child)
+        progress = search.progress()
+        if progress is not None:
+            yield progress
 
+    yield search.done(None if incumbent is None else incumbent.get_path())
+
+
+def solve(root, budget=None, token=None, **kwargs):
+    """Runs Astar within a budget and returns a SearchResult instead of raising
+    SearchLimitExceeded, with the best partial information when the search stops early.
+
+    Parameters
+    ----------
+    root: Node
+        The start node of the problem to be solved.
+
+    budget: Budget, optional
+        The limits of the search. Default is None, no limits.
+
+    token: CancellationToken, optional
+        A token whose cancellation stops the search. Default is None.
+
+    kwargs:
+        The other arguments of Astar, e.g. fringe, stats or weight.
+
+    Returns
+    -------
+        result: SearchResult
+            The status, the solution if any, the statistics and the partial information.
+    """
+    if budget is None:
+        budget = Budget()
+    stats = kwargs.pop('stats', None) or SearchStats()
+    try:
+        path = Astar(root, stats=stats, max_expansions=budget.max_expansions, time_limit=budget.time_limit,
+                     max_open=budget.max_open, token=token, **kwargs)
+    except SearchLimitExceeded as e:
+        return SearchResult(e.status, None, stats, e.best_f, e.deepest)
+    if path is None:
+        return SearchResult(UNSOLVABLE, None, stats)
+    return SearchResult(SOLVED, path, stats, path[-1].f, path[-1])
+
+
+async def solve_async(root, budget=None, token=None, executor=None, **kwargs):
+    """Runs `solve` in an executor so that an asyncio event loop is not blocked.
+
+    If the awaiting task is cancelled, the token is cancelled too so that the search
+    stops at its next check instead of running on in the executor.
+
+    Parameters
+    ----------
+    executor: concurrent.futures.Executor, optional
+        The executor, e.g. a ThreadPoolExecutor. Default is None, the loop's default executor.
+
+    The other parameters are those of `solve`.
+
+    Returns
+    -------
+        result: SearchResult
+            The result of `solve`.
+    """
+    if token is None:
+        token = CancellationToken()
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, partial(solve, root, budget, token, **kwargs))
+    try:
+        return await future
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
+
+
+def _timed(function, stats, counter):
+    # wraps a function so that the time spent in it is added to a counter of the stats
+    clock = time.perf_counter
+
+    def timed(*args):
+        tick = clock()
+        try:
+            return function(*args)
+        finally:
+            setattr(stats, counter, getattr(stats, counter) + clock() - tick)
+
+    return timed
+
+
+def _timing_heuristic(root, stats):
+    # a copy of the root whose class is a subclass of its own, private to the search,
+    # timing evaluate_heuristic into stats.time_heuristic; the children built with the
+    # class of their parent inherit it, and the node classes themselves are not modified,
+    # so concurrent searches do not interfere
+    cls = type(root)
+    evaluate = _timed(cls.evaluate_heuristic, stats, 'time_heuristic')
+    profiled = type(cls.__name__, (cls,), {'__slots__': (), '__module__': cls.__module__,
+                                           'evaluate_heuristic': evaluate})
+    profiled_root = copy.copy(root)
+    profiled_root.__class__ = profiled
+    return profiled_root
+
+
+def ARAstar(root, weights=(3, 2, 1.5, 1), stats=None, max_expansions=None, time_limit=None):
+    """Runs anytime repairing A* (ARA*) given the root node. It yields successively
+    cheaper solutions, each with a bound on how far from optimal it may be.
+
+    Every iteration is a weighted A* search with the next, smaller weight. The
+    iterations share the g values: states whose g improved after they were expanded
+    in the current iteration are set aside as inconsistent instead of being expanded
+    again, and are put back into the fringe for the next iteration together with the
+    nodes still in it, so the work of earlier iterations is reused. An iteration
+    stops as soon as no node in the fringe can lead to a solution cheaper than the
+    current one under its weight.
+
+    Parameters
+    ----------
+    root: Node
+        The start node of the problem to be solved. The bounds hold for consistent heuristics.
+
+    weights: sequence of numbers, optional
+        The decreasing weights of the iterations, at least 1. Default is (3, 2, 1.5, 1).
+
+    stats: SearchStats, optional
+        If given, it is filled in with the statistics of all the iterations. Default is None.
+
+    max_expansions: int, optional
+        The maximum number of nodes to expand over all iterations. Default is None, no limit.
+
+    time_limit: float, optional
+        The maximum wall time in seconds. Default is None, no limit.
+
+    Yields
+    ------
+        path, bound: list of Nodes, float
+            A solution cheaper than the previous ones and a factor such that its cost is at
+            most bound times the optimal cost. The last solution has bound 1 if the search
+            ran to completion with a last weight of 1.
+
+    Raises
+    ------
+        SearchLimitExceeded
+            If max_expansions or time_limit is reached; the solutions already yielded remain valid.
+    """
+    if not weights or min(weights) < 1 or list(weights) != sorted(weights, reverse=True):
+        raise ValueError('the weights must be decreasing and at least 1, got %r' % (weights,))
+    if stats is None:
+        stats = SearchStats()
+    if not root.is_solvable():
+        return
+    expansion_limit = INFINITY if max_expansions is None else max_expansions
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    start = time.perf_counter()
+
+    best = {root.state: root}  # the cheapest node reached for every state
+    opened = {root.state: root}  # the nodes waiting in the fringe
+    incumbent = root if root.is_goal() else None
+    previous_cost = previous_bound = INFINITY
+
+    for weight in weights:
+        def priority(node):
+            return node.g + weight * (node.f - node.g)
+
+        fringe = make_fringe('heap')
+        for node in opened.values():
+            fringe.push(priority(node), node.g, node)
+        closed = set()
+        inconsistent = {}
+
+        while fringe and (incumbent is None or fringe.peek_f() < incumbent.g):
+            current = fringe.pop()
+            state = current.state
+            if opened.get(state) is not current:
+                stats.duplicates += 1
+                continue  # stale entry
+            del opened[state]
+            if stats.expanded >= expansion_limit:
+                raise SearchLimitExceeded('expanded %d nodes' % stats.expanded, EXPANSION_LIMIT)
+            if deadline is not None and not stats.expanded & 1023 and time.perf_counter() > deadline:
+                raise SearchLimitExceeded('ran for more than %g s' % time_limit, TIMEOUT)
+            stats.expanded += 1
+            closed.add(state)
+            children = current.generate_children()
+            stats.generated += len(children)
+            for child in children:
+                child_state = child.state
+                known = best.get(child_state)
+                if known is not None and known.g <= child.g:
+                    stats.duplicates += 1
+                    continue
+                best[child_state] = child
+                if child.is_goal() and (incumbent is None or child.g < incumbent.g):
+                    incumbent = child
+                if child_state in closed:
+                    inconsistent[child_state] = child
+                    opened.pop(child_state, None)
+                else:
+                    opened[child_state] = child
+                    fringe.push(priority(child), child.g, child)
+            stats.peak_open = max(stats.peak_open, len(opened))
+            stats.peak_closed = max(stats.peak_closed, len(closed))
+
+        opened.update(inconsistent)
+        stats.time_total = time.perf_counter() - start
+        if incumbent is None:
+            if not opened:
+                return  # the space is exhausted, there is no solution
+            continue
+        lower = min((node.f for node in opened.values()), default=INFINITY)
+        if incumbent.g <= lower:
+            bound = 1  # no open node leads to a cheaper solution, e.g. at a goal root
+        else:
+            bound = min(weight, incumbent.g / lower) if lower > 0 else weight
+            bound = max(bound, 1)
+        if incumbent.g < previous_cost or bound < previous_bound:
+            previous_cost, previous_bound = incumbent.g, bound
+            yield incumbent.get_path(), bound
+        if bound == 1:
+            return
+
+
+def IDAstar(root, transposition_size=None):
+    """Runs iterative deepening A* given the root node. It returns the same solution
+    as Astar but only keeps the current path in memory, which makes it suitable for
+    deep problems whose fringe would not fit in memory.
+
+    Each iteration is a depth-first search that cuts off nodes whose f exceeds the
+    bound; the next bound is the smallest f that was cut off. A child with the state
+    of its grandparent (undoing the last move) is never generated.
+
+    Parameters
+    ----------
+    root: Node
+        The start node of the problem to be solved.
+
+    transposition_size: int, optional
+        If given, the maximum number of states kept in a transposition table that maps
+        states to the smallest g at which they were reached in the current iteration.
+        States reached again at a g that is not smaller are pruned. Default is None,
+        which disables the table.
+
+    Returns
+    -------
+        path: list of Nodes or None
+            The solution, a path from the initial node to the goal node.
+            If there is no solution it returns None
+    """
+    if not root.is_solvable():
+        return None
+    bound = root.f
+    while True:
+        table = {} if transposition_size else None
+        goal, bound = _bounded_search(root, bound, table, transposition_size)
+        if goal is not None:
+            return goal.get_path()
+        if bound == INFINITY:
+            return None
+
+
+def _bounded_search(root, bound, table, table_size):
+    """Depth-first search of the nodes with f at most bound.
+    Returns the goal node or None, and the smallest f above the bound."""
+    if root.f > bound:
+        return None, root.f
+    if root.is_goal():
+        return root, bound
+    next_bound = INFINITY
+    # a stack of child iterators instead of recursion, so deep problems do not hit the recursion limit
+    stack = [(root, iter(root.generate_children()))]
+    while stack:
+        node, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        if node.parent is not None and child.state == node.parent.state:
+            continue  # move pruning: do not undo the last move
+        if child.f > bound:
+            if child.f < next_bound:
+                next_bound = child.f
+            continue
+        if table is not None:
+            seen = table.get(child.state)
+            if seen is not None and seen <= child.g:
+                continue
+            if seen is not None or len(table) < table_size:
+                table[child.state] = child.g
+        if child.is_goal():
+            return child, bound
+        stack.append((child, iter(child.generate_children())))
+    return None, next_bound
+
+
+def BidirectionalAstar(root, fringe='heap'):
+    """Runs front-to-end bidirectional A* given the root node of a problem whose nodes
+    are `node.ReversibleNode`s. A forward search from the root and a backward search
+    from `root.goal_node()` alternate, expanding the side with the smaller fringe.
+    Whenever one side generates a state the other side has reached, the sum of both
+    costs is a candidate solution. The search stops when the best candidate is not
+    more expensive than the smallest f of either fringe, which no remaining path can
+    beat since both heuristics are admissible.
+
+    Parameters
+    ----------
+    root: ReversibleNode
+        The start node of the problem to be solved.
+
+    fringe: str or class, optional
+        The open-list structure of each side, see Astar. Default is 'heap'.
+
+    Returns
+    -------
+        path: list of Nodes or None
+            The solution, a path from the initial node to the goal node, made of forward
+            nodes as returned by Astar. If there is no solution it returns None
+    """
+    if not root.is_solvable():
+        return None
+    goal = root.goal_node()
+    if root.state == goal.state:
+        return [root]
+    forward = _Frontier(root, fringe, 'generate_children')
+    backward = _Frontier(goal, fringe, 'generate_predecessors')
+    best = INFINITY
+    meeting = None
+
+    while forward.fringe and backward.fringe:
+        if best <= max(forward.fringe.peek_f(), backward.fringe.peek_f()):
+            break
+        side, other = (forward, backward) if len(forward.fringe) <= len(backward.fringe) else (backward, forward)
+        for child in side.expand():
+            match = other.reached.get(child.state)
+            if match is not None and child.g + match.g < best:
+                best = child.g + match.g
+                meeting = (child, match) if side is forward else (match, child)
+
+    if meeting is None:
+        return None
+    return _join(*meeting)
+
+
+class _Frontier:
+    """One side of a bidirectional search: the fringe, the closed set and the cheapest
+    node reached for every state, with the lazy deletion of Astar."""
+
+    def __init__(self, root, fringe, successors):
+        self.fringe = make_fringe(fringe)
+        self.fringe.push(root.f, root.g, root)
+        self.reached = {root.state: root}
+        self.closed = set()
+        self.successors = successors
+
+    def expand(self):
+        """Pops the best node and returns its children that improve on the cheapest known path."""
+        node = self.fringe.pop()
+        state = node.state
+        if node is not self.reached[state] or state in self.closed:
+            return []  # stale entry
+        self.closed.add(state)
+        improved = []
+        for child in getattr(node, self.successors)():
+            known = self.reached.get(child.state)
+            if known is not None and known.g <= child.g:
+                continue
+            self.reached[child.state] = child
+            self.closed.discard(child.state)  # re-open on a cheaper path
+            self.fringe.push(child.f, child.g, child)
+            improved.append(child)
+        return improved
+
+
+def _join(forward_node, backward_node):
+    """Extends the forward path to the meeting state along the states of the backward path.
+    The forward nodes are regenerated so that the result has consistent g and parents."""
+    node = forward_node
+    backward_node = backward_node.parent
+    while backward_node is not None:
+        node = min((child for child in node.generate_children() if child.state == backward_node.state),
+                   key=lambda child: child.g)
+        backward_node = backward_node.parent
+    return node.get_path()
+
+
+def BeamSearch(root, width, stats=None, max_expansions=None, time_limit=None):
+    """Runs beam search given the root node. It bounds the memory of the search by
+    giving up optimality and completeness.
+
+    The search goes layer by layer, a layer being the children of the nodes of the
+    previous one. Only the `width` nodes of lowest f of every layer are kept, the
+    deepest first among equal f, and expanded to build the next layer. The states of
+    the kept nodes are remembered with their g, so that a state is only reached again
+    by a cheaper path. The search stops at the first layer with a goal node.
+
+    The layers are depths rather than values of f: a beam per value of f would keep one
+    beam for every f in the fringe and still need the closed table of Astar, whereas the
+    memory of a beam per depth is bounded by the width times the depth of the solution.
+
+    Parameters
+    ----------
+    root: Node
+        The start node of the problem to be solved.
+
+    width: int
+        The number of nodes kept in every layer.
+
+    stats: SearchStats, optional
+        If given, it is filled in with the statistics of the search, including peak_nodes,
+        the largest number of remembered states plus nodes of the layer being built.
+
+    max_expansions: int, optional
+        The maximum number of nodes to expand. Default is None, no limit.
+
+    time_limit: float, optional
+        The maximum wall time in seconds. Default is None, no limit.
+
+    Returns
+    -------
+        path: list of Nodes or None
+            A solution, not necessarily optimal, as a path from the initial node to the goal
+            node. It returns None if the beam dies out, which may happen for solvable problems
+            as well once every path to a goal has been pruned.
+
+    Raises
+    ------
+        SearchLimitExceeded
+            If max_expansions or time_limit is reached.
+    """
+    if width < 1:
+        raise ValueError('the width must be positive, got %r' % width)
+    if stats is None:
+        stats = SearchStats()
+    if not root.is_solvable():
+        return None
+    expansion_limit = INFINITY if max_expansions is None else max_expansions
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    start = time.perf_counter()
+
+    seen = {root.state: root.g}
+    beam = [root]
+    try:
+        while beam:
+            goals = [node for node in beam if node.is_goal()]
+            if goals:
+                return min(goals, key=lambda node: node.g).get_path()
+            layer = {}
+            for node in beam:
+                if stats.expanded >= expansion_limit:
+                    raise SearchLimitExceeded('expanded %d nodes' % stats.expanded, EXPANSION_LIMIT)
+                if deadline is not None and not stats.expanded & 1023 and time.perf_counter() > deadline:
+                    raise SearchLimitExceeded('ran for more than %g s' % time_limit, TIMEOUT)
+                stats.expanded += 1
+                for child_state, child_g, move in node.successors():
+                    stats.generated += 1
+                    known = layer.get(child_state)
+                    if child_g >= seen.get(child_state, INFINITY) or known is not None and known.g <= child_g:
+                        stats.duplicates += 1
+                        continue
+                    layer[child_state] = node.make_child(move)
+            stats.peak_nodes = max(stats.peak_nodes, len(seen) + len(layer))
+            beam = heapq.nsmallest(width, layer.values(), key=lambda node: (node.f, -node.g))
+            for node in beam:
+                seen[node.state] = node.g
+        return None
+    finally:
+        stats.time_total = time.perf_counter() - start
+
+
+class _MemoryNode:
+    """A node of the search tree of SMA*: the problem node, its backed-up f, its children
+    in memory and the backed-up f of its forgotten children by state. The version tells
+    the current entries of the heaps from the stale ones, it is -1 once forgotten."""
+    __slots__ = ('node', 'parent', 'depth', 'f', 'children', 'forgotten', 'version')
+
+    def __init__(self, node, parent, f):
+        self.node = node
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.f = f
+        self.children = []
+        self.forgotten = {}
+        self.version = 0
+
+
+def SMAstar(root, max_nodes, stats=None, max_expansions=None, time_limit=None):
+    """Runs simplified memory-bounded A* (SMA*) given the root node. It expands the
+    leaves of its search tree in the order of A* until the tree holds more than
+    `max_nodes` nodes, then forgets the worst leaves, those of highest f and the
+    shallowest first, and backs their f up into their parents. A parent with forgotten
+    children stays open with the smallest f of these children, and regenerates them
+    with their backed-up f once it is the best open node.
+
+    The f of a child is at least the f of its parent, and a node that is not a goal is
+    given an infinite f at depth max_nodes - 1, where the tree has no room for its
+    children. Once the f of the root is infinite, no solution fits in memory. The search
+    tree only detects the states repeated along a path, so a state may be in memory
+    several times.
+
+    Parameters
+    ----------
+    root: Node
+        The start node of the problem to be solved.
+
+    max_nodes: int
+        The number of nodes of the search tree, at least 2. The children of a node are
+        generated at once, so the tree exceeds it by fewer nodes than the branching
+        factor until the worst leaves are forgotten.
+
+    stats: SearchStats, optional
+        If given, it is filled in with the statistics of the search, including peak_nodes,
+        the largest number of nodes of the search tree.
+
+    max_expansions: int, optional
+        The maximum number of nodes to expand. Default is None, no limit.
+
+    time_limit: float, optional
+        The maximum wall time in seconds. Default is None, no limit.
+
+    Returns
+    -------
+        path: list of Nodes or None
+            The solution, a path from the initial node to the goal node. It is optimal if
+            the heuristic is admissible and max_nodes is larger than the length of an optimal
+            solution. It returns None if there is no solution within that depth.
+
+    Raises
+    ------
+        SearchLimitExceeded
+            If max_expansions or time_limit is reached.
+    """
+    if max_nodes < 2:
+        raise ValueError('the search tree needs room for at least 2 nodes, got %r' % max_nodes)
+    if stats is None:
+        stats = SearchStats()
+    if not root.is_solvable():
+        return None
+    expansion_limit = INFINITY if max_expansions is None else max_expansions
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    start = time.perf_counter()
 
-            # path = search(child, queue, visited)
-            # if path != [] and path is not None:
-            #     return path
+    # two heaps with lazy deletion: the open nodes, i.e. the leaves and the nodes with
+    # forgotten children, the best first, and the leaves, the worst first
+    best_open = []
+    worst_leaves = []
+    order = itertools.count()
 
+    def add_open(entry):
+        entry.version += 1
+        tie = next(order)
+        if entry.children:
+            if entry.forgotten:
+                heapq.heappush(best_open, (min(entry.forgotten.values()), -entry.depth, -tie, entry.version, entry))
+        else:
+            heapq.heappush(best_open, (entry.f, -entry.depth, -tie, entry.version, entry))
+            heapq.heappush(worst_leaves, (-entry.f, entry.depth, tie, entry.version, entry))
 
+    def pop(entries):
+        while entries:
+            item = heapq.heappop(entries)
+            if item[3] == item[4].version:
+                return item[0], item[4]
+        return INFINITY, None
 
+    def back_up(entry):
+        # the f of a node is the smallest f of its children, in memory or forgotten
+        while entry is not None:
+            f = min(min(child.f for child in entry.children), min(entry.forgotten.values(), default=INFINITY))
+            if f == entry.f:
+                break
+            entry.f = f
+            entry = entry.parent
 
+    add_open(_MemoryNode(root, None, root.f))
+    size = 1
+    stats.peak_nodes = max(stats.peak_nodes, size)
+    try:
+        while True:
+            f, current = pop(best_open)
+            if f == INFINITY:
+                return None
+            node = current.node
+            if not current.children and node.is_goal():
+                return node.get_path()
+            if stats.expanded >= expansion_limit:
+                raise SearchLimitExceeded('expanded %d nodes' % stats.expanded, EXPANSION_LIMIT)
+            if deadline is not None and not stats.expanded & 1023 and time.perf_counter() > deadline:
+                raise SearchLimitExceeded('ran for more than %g s' % time_limit, TIMEOUT)
+            stats.expanded += 1
+            current.version += 1  # no longer open
+            forgotten = current.forgotten
+            current.forgotten = {}
+            present = {child.node.state for child in current.children}
 
+            ancestors = set()
+            entry = current
+            while entry is not None:
+                ancestors.add(entry.node.state)
+                entry = entry.parent
+            for child in node.generate_children():
+                stats.generated += 1
+                if child.state in ancestors:
+                    stats.duplicates += 1
+                    continue
+                if child.state in present:
+                    continue  # a child that was not forgotten
+                if child.state in forgotten:
+                    f = forgotten[child.state]
+                elif current.depth + 1 >= max_nodes - 1 and not child.is_goal():
+                    f = INFINITY  # no room for the children of this child
+                else:
+                    f = max(child.f, current.f)
+                entry = _MemoryNode(child, current, f)
+                current.children.append(entry)
+                add_open(entry)
+                size += 1
+            if current.children:
+                back_up(current)
+            else:
+                current.f = INFINITY  # a dead end
+                add_open(current)
+                if current.parent is not None:
+                    back_up(current.parent)
+            stats.peak_nodes = max(stats.peak_nodes, size)
 
-    return None
+            while size > max_nodes:
+                _, worst = pop(worst_leaves)
+                parent = worst.parent
+                parent.children.remove(worst)
+                parent.forgotten[worst.node.state] = worst.f
+                worst.version = -1
+                size -= 1
+                if not parent.children:
+                    parent.f = min(parent.forgotten.values())
+                add_open(parent)
+            if len(best_open) > 2 * max_nodes + 1024:
+                # drop the stale entries of the heaps
+                best_open[:] = [item for item in best_open if item[3] == item[4].version]
+                worst_leaves[:] = [item for item in worst_leaves if item[3] == item[4].version]
+                heapq.heapify(best_open)
+                heapq.heapify(worst_leaves)
+    finally:
+        stats.time_total = time.perf_counter() - start
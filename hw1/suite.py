@@ -0,0 +1,248 @@
+"""A fixed benchmark suite to catch performance regressions of the search engines.
+
+The 15-puzzle instances are random walks from the goal configuration generated
+by benchmark.scramble with fixed seeds, bucketed by the expansions of A* with the
+Manhattan distance: easy below 10^4, medium below 2 10^5 and hard below 10^6.
+Their optimal lengths were computed with the 5-5-5 additive pattern database.
+Superqueens boards of several sizes complete the suite. Every instance runs in
+its own process, so its peak memory is measured in isolation and a run that
+ignores its timeout is killed. Runs are recorded as JSON and compared ::
+
+    python suite.py run before.json
+    python suite.py run after.json --buckets easy medium
+    python suite.py compare before.json after.json
+
+The comparison flags the instances that got slower by more than the tolerance,
+that expand a different number of nodes, or whose status or cost changed,
+and exits with status 1 if any is flagged.
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+
+from batch import NODES, parse_instance
+from fringe import FRINGES
+from search import Astar, SearchLimitExceeded, SearchStats
+
+# (tiles in row-major order, optimal length)
+FIFTEENS = {
+    'easy': [
+        ('6 1 4 8 5 2 7 3 9 14 0 11 13 15 10 12', 20),  # seed 1000
+        ('1 2 5 4 13 9 3 7 11 6 15 8 0 10 14 12', 27),  # seed 1007
+        ('1 3 4 7 6 5 12 11 0 14 2 8 10 9 13 15', 32),  # seed 1009
+        ('2 8 3 6 1 7 0 11 5 10 14 4 9 13 15 12', 27),  # seed 1013
+        ('6 2 7 4 1 10 3 8 0 9 14 15 5 13 12 11', 28),  # seed 1015
+        ('5 1 2 7 13 10 4 3 0 6 14 8 12 9 11 15', 30),  # seed 1024
+        ('5 2 1 8 9 0 4 6 13 7 11 3 14 15 12 10', 30),  # seed 1030
+        ('9 5 3 7 4 1 15 6 13 2 12 8 10 0 14 11', 34),  # seed 1044
+    ],
+    'medium': [
+        ('0 13 5 8 1 10 4 6 11 3 7 2 9 12 15 14', 42),  # seed 1003
+        ('2 7 0 3 1 8 5 12 9 4 14 15 13 10 11 6', 34),  # seed 1010
+        ('3 2 0 10 5 8 12 15 9 1 11 4 13 7 14 6', 40),  # seed 1011
+        ('11 1 5 4 14 2 10 3 13 15 0 7 12 9 6 8', 40),  # seed 1021
+        ('11 4 0 8 3 14 1 12 13 7 5 15 10 9 2 6', 44),  # seed 1029
+        ('9 1 4 8 15 2 3 12 6 13 0 10 11 14 5 7', 40),  # seed 1032
+        ('15 1 11 2 4 0 8 3 6 13 10 12 5 9 14 7', 42),  # seed 1034
+        ('1 5 14 8 10 2 9 0 15 7 6 3 13 11 12 4', 42),  # seed 1045
+    ],
+    'hard': [
+        ('10 5 4 3 6 0 13 1 12 15 8 7 9 11 14 2', 46),  # seed 1022
+        ('1 2 5 4 14 7 9 10 11 13 15 12 8 3 6 0', 46),  # seed 1040
+        ('6 4 3 5 2 12 1 15 0 10 11 7 9 13 14 8', 42),  # seed 1027
+        ('2 5 7 3 6 0 11 1 10 8 13 14 9 12 4 15', 44),  # seed 1004
+        ('1 6 4 12 3 5 13 2 15 9 10 14 8 0 7 11', 46),  # seed 1008
+        ('11 1 3 2 5 7 6 8 10 9 14 12 0 13 4 15', 41),  # seed 1001
+    ],
+}
+
+SUPERQUEENS = (6, 8, 10, 11)
+
+BUCKETS = tuple(FIFTEENS) + ('superqueens',)
+
+
+def instances(buckets=BUCKETS):
+    """Returns the instances of the buckets as (name, bucket, line, optimal length)
+    tuples. The optimal length of the Superqueens boards is not recorded, it is None."""
+    selected = []
+    for bucket in buckets:
+        if bucket == 'superqueens':
+            selected.extend(('superqueens-%d' % n, bucket, str(n), None) for n in SUPERQUEENS)
+        else:
+            selected.extend(('%s-%d' % (bucket, i), bucket, line, length)
+                            for i, (line, length) in enumerate(FIFTEENS[bucket]))
+    return selected
+
+
+def _measure(line, node, fringe, timeout, connection):
+    # runs in a child process: the growth of its peak resident set is the memory of the search
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats = SearchStats()
+    root = parse_instance(line, NODES[node])
+    try:
+        path = Astar(root, fringe=fringe, stats=stats, time_limit=timeout)
+    except SearchLimitExceeded:
+        result = {'status': 'timeout'}
+    else:
+        result = {'status': 'unsolved'} if path is None else \
+            {'status': 'solved', 'length': len(path) - 1, 'cost': path[-1].g}
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result.update(expansions=stats.expanded, wall_time=round(stats.time_total, 6), peak_memory_kb=peak - baseline)
+    connection.send(result)
+
+
+def run_instance(line, node='packed', fringe='bucket', timeout=60.0):
+    """Solves an instance with Astar in a child process and returns its measures.
+
+    Parameters
+    ----------
+    line : str
+        The instance line, as in batch.py.
+
+    node : str, optional
+        The node class of 15-puzzle instances, a key of batch.NODES. Default is 'packed'.
+
+    fringe : str, optional
+        The fringe of Astar. Default is 'bucket'.
+
+    timeout : float, optional
+        The time limit of the search in seconds. The child process is killed if it runs
+        10 seconds past it. Default is 60.
+
+    Returns
+    -------
+        result : dict
+            The status ('solved', 'unsolved', 'timeout' or 'killed'), the length and the cost
+            if solved, the expansions, the wall time of the search and its peak memory in KiB.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_measure, args=(line, node, fringe, timeout, sender), daemon=True)
+    process.start()
+    sender.close()
+    result = None
+    if receiver.poll(timeout + 10):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            pass  # the child died before sending its result
+    if process.is_alive():
+        process.terminate()
+    process.join()
+    return result or {'status': 'killed'}
+
+
+def run_suite(buckets=BUCKETS, node='packed', fringe='bucket', timeout=60.0, log=None):
+    """Runs the instances of the buckets one after the other and returns the record of
+    the run, a dict that can be dumped as JSON. If log is given, it is called with every
+    result as soon as it is measured."""
+    results = []
+    for name, bucket, line, optimal in instances(buckets):
+        result = {'name': name, 'bucket': bucket, 'input': line, 'optimal': optimal}
+        result.update(run_instance(line, node, fringe, timeout))
+        results.append(result)
+        if log is not None:
+            log(result)
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'node': node, 'fringe': fringe, 'timeout': timeout},
+        'results': results,
+    }
+
+
+def compare(base, new, tolerance=0.1, min_time=0.05):
+    """Compares two runs on the instances they share and returns the regressions as
+    (name, message) pairs.
+
+    Parameters
+    ----------
+    base, new : dict
+        The records of the runs, as returned by run_suite.
+
+    tolerance : float, optional
+        The relative slowdown that is flagged. Default is 0.1, 10% slower.
+
+    min_time : float, optional
+        Instances faster than this in both runs, in seconds, are too noisy to be timed.
+        Default is 0.05.
+
+    Returns
+    -------
+        regressions : list of tuples
+            The name of every flagged instance and the reason.
+    """
+    old = {result['name']: result for result in base['results']}
+    regressions = []
+    for result in new['results']:
+        name = result['name']
+        if name not in old:
+            continue
+        before = old[name]
+        if result['status'] != before['status']:
+            regressions.append((name, 'status %s -> %s' % (before['status'], result['status'])))
+            continue
+        if result['status'] != 'solved':
+            continue
+        if result['optimal'] is not None and result['length'] != result['optimal']:
+            regressions.append((name, 'length %d, the optimum is %d' % (result['length'], result['optimal'])))
+        elif result['cost'] != before['cost']:
+            regressions.append((name, 'cost %d -> %d' % (before['cost'], result['cost'])))
+        if result['expansions'] != before['expansions']:
+            regressions.append((name, 'expansions %d -> %d' % (before['expansions'], result['expansions'])))
+        if max(result['wall_time'], before['wall_time']) >= min_time \
+                and result['wall_time'] > before['wall_time'] * (1 + tolerance):
+            regressions.append((name, 'wall time %.3f s -> %.3f s (%+.0f%%)' % (
+                before['wall_time'], result['wall_time'], 100 * (result['wall_time'] / before['wall_time'] - 1))))
+    return regressions
+
+
+def _print_result(result):
+    print('%-16s %-8s %6s %12s %10s %12s' % (
+        result['name'], result['status'], result.get('cost', '-'), result.get('expansions', '-'),
+        result.get('wall_time', '-'), result.get('peak_memory_kb', '-')), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run the suite and record the results')
+    run.add_argument('output', help='the JSON file receiving the results')
+    run.add_argument('--buckets', nargs='+', choices=BUCKETS, default=list(BUCKETS), help='the buckets to run')
+    run.add_argument('--node', choices=sorted(NODES), default='packed', help='node class of 15-puzzle instances')
+    run.add_argument('--fringe', choices=sorted(FRINGES), default='bucket', help='fringe of the search')
+    run.add_argument('--timeout', type=float, default=60.0, help='time limit per instance in seconds')
+    comparison = commands.add_parser('compare', help='compare two recorded runs')
+    comparison.add_argument('base', help='the JSON file of the reference run')
+    comparison.add_argument('new', help='the JSON file of the run to check')
+    comparison.add_argument('--tolerance', type=float, default=0.1, help='relative slowdown that is flagged')
+    comparison.add_argument('--min-time', type=float, default=0.05, help='wall time below which runs are not timed')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        print('%-16s %-8s %6s %12s %10s %12s' % ('instance', 'status', 'cost', 'expansions', 'time (s)', 'memory (KiB)'))
+        record = run_suite(args.buckets, args.node, args.fringe, args.timeout, log=_print_result)
+        with open(args.output, 'w') as f:
+            json.dump(record, f, indent=1)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(base, new, args.tolerance, args.min_time)
+    for name, message in regressions:
+        print('%-16s %s' % (name, message))
+    if not regressions:
+        print('no regression')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,9 +3,519 @@ NOTE: Do not rely on these tests as they are just simple examples.
 Your code will be tested on some secret instances of the problems!
 """
 
+import asyncio
+import os
+import tempfile
+import threading
+from itertools import permutations
+import time
 import unittest
-from problems import FifteensNode, SuperqueensNode
-from search import Astar
+from node import Node
+import problems
+from problems import FifteensNode, PackedFifteensNode, SuperqueensNode, standard_goal
+from search import (ARAstar, Astar, BeamSearch, BidirectionalAstar, Budget, CancellationToken, IDAstar,
+                    IncrementalAstar, SearchLimitExceeded, SearchStats, SMAstar, solve, solve_async)
+from cache import SolutionCache
+from batch import anytime_weights, parse_instance, read_instances
+from heuristics import HEURISTICS
+from localsearch import min_conflicts
+from fringe import BucketFringe, HeapFringe
+from patterndb import AdditivePDB, PatternDatabase
+from parallel import HDAstar
+from suite import compare, run_instance
+
+
+class GraphNode(Node):
+    """A node of a small explicit weighted graph, used to exercise the search engines.
+
+    The heuristic is admissible but inconsistent, so A* expands C through B
+    before discovering the cheaper path through A.
+    """
+    edges = {'S': [('A', 1), ('B', 3)], 'A': [('C', 1)], 'B': [('C', 1)], 'C': [('G', 10)], 'G': []}
+    h = {'S': 0, 'A': 10, 'B': 0, 'C': 0, 'G': 0}
+
+    def __init__(self, parent=None, g=0, name='S'):
+        self.name = name
+        super(GraphNode, self).__init__(parent, g)
+
+    def generate_children(self):
+        return [GraphNode(self, self.g + cost, name) for name, cost in self.edges[self.name]]
+
+    def is_goal(self):
+        return self.name == 'G'
+
+    def evaluate_heuristic(self):
+        return self.h[self.name]
+
+    def _get_state(self):
+        return (self.name,)
+
+    def __str__(self):
+        return self.name
+
+
+class TestAstar(unittest.TestCase):
+    def test_reopens_closed_states(self):
+        """Test that a closed state is re-opened when a cheaper path to it is found.
+        """
+        path = Astar(GraphNode())
+        self.assertEqual([node.name for node in path], ['S', 'A', 'C', 'G'])
+        self.assertEqual(path[-1].g, 12)
+
+    def test_limits(self):
+        """Test that Astar counts its expansions and stops at the expansion budget.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        stats = SearchStats()
+        path = Astar(PackedFifteensNode(input_str=input_str), stats=stats)
+        self.assertGreater(stats.generated, stats.expanded)
+        self.assertGreaterEqual(stats.expanded, len(path) - 1)
+        with self.assertRaises(SearchLimitExceeded):
+            Astar(PackedFifteensNode(input_str=input_str), max_expansions=stats.expanded - 1)
+
+    def test_stats_and_hooks(self):
+        """Test the statistics, the profiling, the expansion callback and the reporter.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        expanded = []
+        reports = []
+        stats = SearchStats()
+        path = Astar(FifteensNode(input_str=input_str), stats=stats, profile=True,
+                     on_expand=lambda node, stats: expanded.append(node.state),
+                     reporter=lambda path, stats: reports.append((len(path), stats.expanded)))
+        self.assertEqual(len(expanded), stats.expanded)
+        self.assertEqual(expanded[0], path[0].state)
+        self.assertEqual(reports, [(len(path), stats.expanded)])
+        self.assertGreaterEqual(stats.peak_open, 1)
+        self.assertEqual(stats.peak_closed, stats.expanded)
+        self.assertGreater(stats.time_children, stats.time_heuristic)
+        self.assertGreater(stats.time_heuristic, 0)
+        self.assertGreater(stats.time_fringe, 0)
+        self.assertGreaterEqual(stats.time_total, stats.time_children + stats.time_fringe)
+        self.assertIs(FifteensNode.evaluate_heuristic, vars(FifteensNode)['evaluate_heuristic'])
+        self.assertIn('expansions_per_second', stats.as_dict())
+        self.assertTrue(all(type(node) is FifteensNode for node in path))
+
+    def test_concurrent_profiling(self):
+        """Test that profiled searches in threads time their own heuristic calls and leave the node class alone.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        evaluate = FifteensNode.evaluate_heuristic
+        all_stats = [SearchStats() for _ in range(4)]
+        threads = [threading.Thread(target=Astar, args=(FifteensNode(input_str=input_str),),
+                                    kwargs={'stats': stats, 'profile': True}) for stats in all_stats]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIs(FifteensNode.evaluate_heuristic, evaluate)
+        times = [stats.time_heuristic for stats in all_stats]
+        self.assertTrue(all(times))
+        Astar(FifteensNode(input_str=input_str))
+        self.assertEqual([stats.time_heuristic for stats in all_stats], times)
+
+    def test_budgets(self):
+        """Test that solve reports the exhausted budget with the partial information.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        result = solve(PackedFifteensNode(input_str=input_str))
+        self.assertEqual(result.status, 'solved')
+        self.assertEqual(result.best_f, result.path[-1].g)
+
+        result = solve(PackedFifteensNode(input_str=input_str), Budget(max_expansions=20))
+        self.assertEqual(result.status, 'expansion_limit')
+        self.assertIsNone(result.path)
+        self.assertEqual(result.stats.expanded, 20)
+        self.assertLessEqual(result.best_f, len(solve(PackedFifteensNode(input_str=input_str)).path) - 1)
+        self.assertGreater(result.deepest.g, 0)
+
+        result = solve(PackedFifteensNode(input_str=input_str), Budget(max_open=10))
+        self.assertEqual(result.status, 'open_limit')
+        result = solve(PackedFifteensNode(input_str=input_str), Budget(time_limit=0))
+        self.assertEqual(result.status, 'timeout')
+
+    def test_incremental(self):
+        """Test that IncrementalAstar streams progress and ends with the path Astar returns.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        path = Astar(PackedFifteensNode(input_str=input_str))
+        snapshots = list(IncrementalAstar(PackedFifteensNode(input_str=input_str), report_every=10))
+        self.assertTrue(snapshots[-1].done)
+        self.assertEqual([node.state for node in snapshots[-1].path], [node.state for node in path])
+        self.assertFalse(any(progress.done for progress in snapshots[:-1]))
+        self.assertEqual([progress.expanded for progress in snapshots[:-1]],
+                         list(range(10, 10 * len(snapshots) - 9, 10)))
+        bounds = [progress.f_bound for progress in snapshots]
+        self.assertEqual(bounds, sorted(bounds))
+        self.assertLessEqual(bounds[-1], len(path) - 1)
+
+        # stopping the consumption stops the search
+        stats = SearchStats()
+        steps = IncrementalAstar(PackedFifteensNode(input_str=input_str), stats=stats, report_every=5)
+        self.assertEqual(next(steps).expanded, 5)
+        steps.close()
+        self.assertEqual(stats.expanded, 5)
+
+    def test_cancellation(self):
+        """Test that a cancelled token stops the search, also when run from asyncio.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(SearchLimitExceeded) as context:
+            Astar(PackedFifteensNode(input_str=input_str), token=token)
+        self.assertEqual(context.exception.status, 'cancelled')
+
+        async def run():
+            solved = await solve_async(PackedFifteensNode(input_str=input_str))
+            token = CancellationToken()
+            # an instance too hard for Manhattan A* to finish during the test
+            hard = '0 12  9 13\n15 11 10 14\n3  7  2  5\n4  8  6  1'
+            task = asyncio.ensure_future(solve_async(PackedFifteensNode(input_str=hard), token=token))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return solved, token
+
+        solved, token = asyncio.run(run())
+        self.assertEqual(solved.status, 'solved')
+        self.assertTrue(token.cancelled)
+
+    def test_bucket_fringe(self):
+        """Test that Astar with the bucket fringe finds a solution as short as with the heap.
+        """
+        input_str = '1  2  3  4\n5  6  0  8\n9 10  7 11\n13 14 15 12'
+        heap_path = Astar(FifteensNode(input_str=input_str), fringe='heap')
+        bucket_path = Astar(FifteensNode(input_str=input_str), fringe='bucket')
+        self.assertEqual(len(bucket_path), len(heap_path))
+        self.assertTrue(bucket_path[-1].is_goal())
+
+
+class TestSolutionCache(unittest.TestCase):
+    def test_repeated_and_overlapping_queries(self):
+        """Test that cached states cut the search short without losing optimality.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        cache = SolutionCache()
+        path = Astar(PackedFifteensNode(input_str=input_str), cache=cache)
+        self.assertEqual(len(cache), len(path))
+        stats = SearchStats()
+        again = Astar(PackedFifteensNode(input_str=input_str), stats=stats, cache=cache)
+        self.assertEqual(stats.expanded, 1)
+        self.assertEqual([node.state for node in again], [node.state for node in path])
+        self.assertEqual(again[-1].g, len(again) - 1)
+        self.assertTrue(again[-1].is_goal())
+
+        # a neighbour of the root is solved through the cached root
+        for child in PackedFifteensNode(input_str=input_str).generate_children():
+            root = PackedFifteensNode(packed=child.packed, blank=child.blank)
+            expected = len(Astar(PackedFifteensNode(packed=child.packed, blank=child.blank)))
+            cached = Astar(root, cache=cache)
+            self.assertEqual(len(cached), expected)
+            self.assertTrue(cached[-1].is_goal())
+        self.assertGreater(cache.hit_rate, 0)
+
+    def test_tiers(self):
+        """Test that the disk tier is shared between caches and that the memory tier is bounded.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite')
+            with SolutionCache(path, capacity=5) as cache:
+                solution = Astar(FifteensNode(input_str=input_str), cache=cache)
+                self.assertEqual(len(cache), 5)
+            with SolutionCache(path) as cache:
+                stats = SearchStats()
+                self.assertEqual(len(Astar(FifteensNode(input_str=input_str), stats=stats, cache=cache)),
+                                 len(solution))
+                self.assertEqual((stats.expanded, cache.disk_hits, cache.memory_hits), (1, 1, 0))
+
+    def test_problems_sharing_a_cache(self):
+        """Test that Superqueens boards of several sizes share a cache, in memory and on disk, without mixing their states.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite')
+            with SolutionCache(path) as cache:
+                self.assertTrue(Astar(SuperqueensNode(n=6), cache=cache)[-1].is_goal())
+                for n in (7, 8):
+                    solution = Astar(SuperqueensNode(n=n), cache=cache)
+                    self.assertTrue(solution[-1].is_goal())
+                    self.assertEqual(solution[-1].g, Astar(SuperqueensNode(n=n))[-1].g)
+            with SolutionCache(path) as cache:
+                for n in (6, 7, 8, 9):
+                    self.assertTrue(Astar(SuperqueensNode(n=n), cache=cache)[-1].is_goal())
+                self.assertEqual(cache.disk_hits, 3)
+
+    def test_evicted_continuation(self):
+        """Test that a cached state whose successors were evicted is expanded instead of dropped.
+        """
+        input_str = '1  2  3  4\n5  6  0  8\n9 10  7 11\n13 14 15 12'  # 3 moves
+        cache = SolutionCache(capacity=4)
+        path = Astar(PackedFifteensNode(input_str=input_str), cache=cache)
+        self.assertIsNotNone(cache.get(path[0].problem_key(), path[0].state))  # the root becomes the most recent entry
+        Astar(PackedFifteensNode(input_str='1  2  3  4\n5  6  7  8\n9 10 11 12\n13 14  0 15'), cache=cache)
+        self.assertIsNone(cache.continuation(PackedFifteensNode(input_str=input_str)))
+        again = Astar(PackedFifteensNode(input_str=input_str), cache=cache)
+        self.assertEqual([node.state for node in again], [node.state for node in path])
+
+
+class TestWeightedSearch(unittest.TestCase):
+    input_str = '9 6 0 4\n1 3 5 2\n13 7 15 8\n14 12 10 11'
+
+    def test_weighted_astar(self):
+        """Test that weighted A* finds a solution within its bound with both fringes.
+        """
+        optimal = Astar(PackedFifteensNode(input_str=self.input_str))[-1].g
+        for fringe in ('heap', 'bucket'):
+            path = Astar(PackedFifteensNode(input_str=self.input_str), fringe=fringe, weight=3)
+            self.assertTrue(path[-1].is_goal())
+            self.assertLessEqual(path[-1].g, 3 * optimal)
+        self.assertRaises(ValueError, Astar, PackedFifteensNode(input_str=self.input_str), weight=0.5)
+
+    def test_anytime(self):
+        """Test that ARA* yields cheaper solutions within their bounds and ends with an optimal one.
+        """
+        optimal = Astar(PackedFifteensNode(input_str=self.input_str))[-1].g
+        solutions = list(ARAstar(PackedFifteensNode(input_str=self.input_str), weights=(5, 3, 2, 1.5, 1)))
+        costs = [path[-1].g for path, bound in solutions]
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        for path, bound in solutions:
+            self.assertTrue(path[-1].is_goal())
+            self.assertLessEqual(path[-1].g, bound * optimal + 1e-9)
+        self.assertEqual(solutions[-1][1], 1)
+        self.assertEqual(costs[-1], optimal)
+        self.assertEqual(list(ARAstar(GraphNode(), weights=(2, 1)))[-1][0][-1].g, 12)
+        self.assertEqual(anytime_weights(3), [3, 2, 1.5, 1.25, 1.125, 1])
+        goal = PackedFifteensNode(input_str='1  2  3  4\n5  6  7  8\n9 10 11 12\n13 14 15  0')
+        solutions = list(ARAstar(goal, weights=(3, 2, 1)))
+        self.assertEqual([(len(path), bound) for path, bound in solutions], [(1, 1)])
+
+
+class TestBatchedAstar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pdb = AdditivePDB([PatternDatabase.build((1, 2, 3)), PatternDatabase.build((4, 8))])
+
+    def test_optimal(self):
+        """Test that the batched expansion finds optimal solutions whatever the batch size.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        expected = len(Astar(FifteensNode(input_str=input_str)))
+        for batch_size in (1, 7, 64):
+            for heuristic in (None, self.pdb, HEURISTICS['linear-conflict']):
+                path = Astar(PackedFifteensNode(input_str=input_str, heuristic=heuristic), batch_size=batch_size)
+                self.assertEqual(len(path), expected)
+                self.assertTrue(path[-1].is_goal())
+            self.assertEqual(len(Astar(FifteensNode(input_str=input_str), fringe='bucket', batch_size=batch_size)),
+                             expected)
+            # the goal G is popped in the batch of C, before the cheaper path through A is found
+            self.assertEqual(Astar(GraphNode(), batch_size=batch_size)[-1].g, 12)
+
+    @unittest.skipIf(problems.np is None, 'NumPy is not installed')
+    def test_vectorized_children(self):
+        """Test that the NumPy expansion builds the same children as generate_children.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        for heuristic in (None, self.pdb, HEURISTICS['walking-distance']):
+            root = PackedFifteensNode(input_str=input_str, heuristic=heuristic)
+            nodes = [root] + root.generate_children()
+            nodes += [child for node in nodes[1:] for child in node.generate_children()]
+            for node, children in zip(nodes, PackedFifteensNode.generate_children_batch(nodes)):
+                expected = node.generate_children()
+                self.assertEqual([(child.state, child.blank, child.h, child.g) for child in children],
+                                 [(child.state, child.blank, child.h, child.g) for child in expected])
+                self.assertTrue(all(child.parent is node for child in children))
+
+
+class TestIDAstar(unittest.TestCase):
+    def test_same_length_as_astar(self):
+        """Test that IDA* finds solutions as short as A*, with and without a transposition table.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        expected = len(Astar(PackedFifteensNode(input_str=input_str)))
+        for transposition_size in (None, 1000):
+            path = IDAstar(PackedFifteensNode(input_str=input_str), transposition_size)
+            self.assertEqual(len(path), expected)
+            self.assertTrue(path[-1].is_goal())
+            self.assertIsNone(path[0].parent)
+
+    def test_weighted_edges(self):
+        """Test that IDA* returns the cheapest path on a graph with weighted edges.
+        """
+        path = IDAstar(GraphNode())
+        self.assertEqual(path[-1].g, 12)
+
+    def test_superqueens(self):
+        """Test that IDA* finds a complete Superqueens placement with the optimal conflict count.
+        """
+        path = IDAstar(SuperqueensNode(n=6))
+        self.assertTrue(path[-1].is_goal())
+        self.assertEqual(path[-1].g, Astar(SuperqueensNode(n=6))[-1].g)
+
+
+class TestMemoryBoundedSearch(unittest.TestCase):
+    instances = [('5 1 2 3\n9 6 7 4\n13 10 11 8\n14 0 15 12', 10),
+                 ('6 1 4 8 5 2 7 3 9 14 0 11 13 15 10 12', 20),
+                 ('1 2 5 4 13 9 3 7 11 6 15 8 0 10 14 12', 27)]
+
+    def test_beam_search(self):
+        """Test that beam search solves the instances within its width and is optimal with a wide beam.
+        """
+        for line, length in self.instances:
+            stats = SearchStats()
+            path = BeamSearch(parse_instance(line), 1000, stats=stats)
+            self.assertEqual(len(path) - 1, length)
+            self.assertTrue(path[-1].is_goal())
+            stats = SearchStats()
+            path = BeamSearch(parse_instance(line), 10, stats=stats)
+            self.assertGreaterEqual(len(path) - 1, length)
+            self.assertTrue(path[-1].is_goal())
+            self.assertLessEqual(stats.peak_nodes, 10 * 4 * len(path))
+        self.assertEqual(BeamSearch(GraphNode(), 1)[-1].g, 14)  # the cheaper branch is pruned
+        self.assertEqual(BeamSearch(GraphNode(), 2)[-1].g, 12)
+        self.assertTrue(BeamSearch(SuperqueensNode(n=8), 20)[-1].is_goal())
+        self.assertRaises(ValueError, BeamSearch, GraphNode(), 0)
+
+    def test_sma_star(self):
+        """Test that SMA* is optimal within its node cap and returns None without the memory for a solution.
+        """
+        for line, length in self.instances:
+            for max_nodes in (length + 1, 60, 1000):
+                stats = SearchStats()
+                path = SMAstar(parse_instance(line), max_nodes, stats=stats, max_expansions=200000)
+                self.assertEqual(len(path) - 1, length)
+                self.assertTrue(path[-1].is_goal())
+                self.assertLessEqual(stats.peak_nodes, max_nodes + 3)
+        line, length = self.instances[0]
+        for max_nodes in range(2, length + 1):
+            self.assertIsNone(SMAstar(parse_instance(line), max_nodes))
+        self.assertIsNone(SMAstar(GraphNode(), 3))
+        self.assertEqual(SMAstar(GraphNode(), 4)[-1].g, 12)
+        self.assertEqual(SMAstar(SuperqueensNode(n=6), 50)[-1].g, Astar(SuperqueensNode(n=6))[-1].g)
+        self.assertRaises(ValueError, SMAstar, GraphNode(), 1)
+
+
+class TestBidirectionalAstar(unittest.TestCase):
+    def test_same_length_as_astar(self):
+        """Test that bidirectional search finds solutions as short as A* for both 15-puzzle nodes.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        for cls in (FifteensNode, PackedFifteensNode):
+            expected = len(Astar(cls(input_str=input_str)))
+            path = BidirectionalAstar(cls(input_str=input_str))
+            self.assertEqual(len(path), expected)
+            self.assertTrue(path[-1].is_goal())
+            self.assertEqual(path[-1].g, len(path) - 1)
+            for parent, child in zip(path, path[1:]):
+                self.assertIs(child.parent, parent)
+
+    def test_goal_root(self):
+        """Test that the path of a root in the goal configuration is the root alone.
+        """
+        final_str = "1  2  3  4\n5  6  7  8\n9 10 11 12\n13 14 15  0"
+        self.assertEqual(len(BidirectionalAstar(FifteensNode(input_str=final_str))), 1)
+
+    def test_goal_node(self):
+        """Test that the goal node of a backward search targets the start board.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12'
+        root = PackedFifteensNode(input_str=input_str)
+        goal = root.goal_node()
+        self.assertTrue(PackedFifteensNode(board=goal.board).is_goal())
+        self.assertEqual(goal.evaluate_heuristic(), root.evaluate_heuristic())
+        self.assertTrue(PackedFifteensNode(board=root.board, goal=goal.goal).is_goal())
+
+
+class TestHDAstar(unittest.TestCase):
+    def test_optimal(self):
+        """Test that hash-distributed A* finds optimal solutions with several workers.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        expected = len(Astar(PackedFifteensNode(input_str=input_str)))
+        for cls, workers in ((PackedFifteensNode, 3), (FifteensNode, 2)):
+            stats = SearchStats()
+            path = HDAstar(cls(input_str=input_str), workers=workers, batch_size=4, stats=stats)
+            self.assertEqual(len(path), expected)
+            self.assertTrue(path[-1].is_goal())
+            self.assertEqual(path[-1].g, len(path) - 1)
+            self.assertGreaterEqual(stats.expanded, len(path) - 1)
+        # the inconsistent heuristic of the graph needs a re-opening
+        self.assertEqual(HDAstar(GraphNode(), workers=2)[-1].g, 12)
+        self.assertEqual(HDAstar(SuperqueensNode(n=6), workers=2)[-1].g, Astar(SuperqueensNode(n=6))[-1].g)
+
+
+class TestBatch(unittest.TestCase):
+    def test_parse_instances(self):
+        """Test that instance lines are parsed into 15-puzzle and Superqueens root nodes.
+        """
+        lines = ['# a comment', '1 2 3 4 5 6 7 8 9 10 0 11 13 14 15 12', '', '  7 ']
+        instances = list(read_instances(lines))
+        self.assertEqual(instances, [(0, '1 2 3 4 5 6 7 8 9 10 0 11 13 14 15 12'), (1, '7')])
+        fifteens_root = parse_instance(instances[0][1], FifteensNode)
+        self.assertEqual(str(fifteens_root), '  1  2  3  4\n  5  6  7  8\n  9 10    11\n 13 14 15 12\n')
+        self.assertEqual(parse_instance(instances[1][1]).n, 7)
+        self.assertRaises(ValueError, parse_instance, '1 2 3')
+
+
+class TestSuite(unittest.TestCase):
+    def test_run_instance(self):
+        """Test that the suite measures an instance in a child process and stops it at its timeout.
+        """
+        result = run_instance('6 1 4 8 5 2 7 3 9 14 0 11 13 15 10 12')
+        self.assertEqual((result['status'], result['length'], result['cost']), ('solved', 20, 20))
+        self.assertGreater(result['expansions'], 0)
+        self.assertGreaterEqual(result['peak_memory_kb'], 0)
+        result = run_instance('10 5 4 3 6 0 13 1 12 15 8 7 9 11 14 2', timeout=0.01)
+        self.assertEqual(result['status'], 'timeout')
+
+    def test_compare(self):
+        """Test that the comparison flags slowdowns, changed expansions and changed statuses only.
+        """
+        def record(*results):
+            keys = ('name', 'status', 'optimal', 'length', 'cost', 'expansions', 'wall_time')
+            return {'results': [dict(zip(keys, result)) for result in results]}
+
+        base = record(('a', 'solved', 20, 20, 20, 100, 1.0), ('b', 'solved', 20, 20, 20, 100, 0.01),
+                      ('c', 'solved', None, 8, 2, 100, 1.0), ('d', 'solved', 20, 20, 20, 100, 1.0))
+        new = record(('a', 'solved', 20, 20, 20, 100, 1.05), ('b', 'solved', 20, 20, 20, 100, 0.03),
+                     ('c', 'solved', None, 8, 3, 90, 1.0), ('d', 'timeout', 20, None, None, 900, 10.0))
+        self.assertEqual(compare(base, new), [('c', 'cost 2 -> 3'), ('c', 'expansions 100 -> 90'),
+                                              ('d', 'status solved -> timeout')])
+        self.assertEqual([name for name, _ in compare(base, new, tolerance=0.01)], ['a', 'c', 'c', 'd'])
+
+
+class TestFringe(unittest.TestCase):
+    def test_pop_order(self):
+        """Test that fringes pop the smallest f first and break ties on the larger g.
+        """
+        for fringe in (HeapFringe(), BucketFringe()):
+            for f, g in [(5, 1), (3, 0), (5, 4), (3, 2), (7, 7)]:
+                fringe.push(f, g, (f, g))
+            self.assertEqual(fringe.peek_f(), 3)
+            popped = [fringe.pop() for _ in range(len(fringe))]
+            self.assertEqual(popped, [(3, 2), (3, 0), (5, 4), (5, 1), (7, 7)])
+
+    def test_push_below_minimum(self):
+        """Test that the bucket fringe handles pushes below the current minimum f.
+        """
+        fringe = BucketFringe()
+        fringe.push(4, 0, 'a')
+        self.assertEqual(fringe.pop(), 'a')
+        fringe.push(6, 0, 'b')
+        fringe.push(2, 0, 'c')
+        self.assertEqual([fringe.pop(), fringe.pop()], ['c', 'b'])
+        self.assertRaises(IndexError, fringe.pop)
+
+    def test_non_integer_priorities(self):
+        """Test that the bucket fringe rejects fractional priorities with a ValueError pointing to the heap.
+        """
+        self.assertRaises(ValueError, BucketFringe().push, 2.5, 1, 'a')
+        root = FifteensNode(input_str='1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12')
+        with self.assertRaisesRegex(ValueError, 'heap'):
+            Astar(root, fringe='bucket', weight=1.5)
+        self.assertTrue(Astar(root, fringe='heap', weight=1.5)[-1].is_goal())
+        self.assertEqual(Astar(root, fringe='bucket', weight=2.0)[-1].g, Astar(root, fringe='bucket', weight=2)[-1].g)
 
 
 class TestFifteens(unittest.TestCase):
@@ -38,6 +548,16 @@ class TestFifteens(unittest.TestCase):
         fifteens_node = FifteensNode(input_str=final_str)
         self.assertEqual(fifteens_node.evaluate_heuristic(), 0)
 
+    def test_incremental_heuristic(self):
+        """Test that the heuristic of a child, computed from its parent, matches a full evaluation.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        node = FifteensNode(input_str=input_str)
+        for _ in range(3):
+            for child in node.generate_children():
+                self.assertEqual(child.evaluate_heuristic(), FifteensNode(board=child.board).evaluate_heuristic())
+            node = child
+
     def test_a_star_algorithm(self):
         """Test that the length of the solution to a sample initial configuration is correct,
         and the last state is the goal.
@@ -49,6 +569,209 @@ class TestFifteens(unittest.TestCase):
         self.assertTrue(fifteens_path[-1].is_goal())
 
 
+class TestSlidingPuzzles(unittest.TestCase):
+    def test_solvability(self):
+        """Test that the parity check agrees with the boards reachable from the goal, for every 2x2 and some 3x3 boards.
+        """
+        for size, limit in ((2, None), (3, 20)):
+            reachable = set()
+            frontier = [PackedFifteensNode(board=standard_goal(size).board)]
+            depth = 0
+            while frontier and (limit is None or depth <= limit):
+                reachable.update(node.state for node in frontier)
+                frontier = [child for node in frontier for child in node.generate_children()
+                            if child.state not in reachable]
+                depth += 1
+            for tiles in permutations(range(size * size)):
+                if size == 3 and tiles[1:3] != (2, 3):
+                    continue  # a sample of the 3x3 boards
+                board = [list(tiles[i:i + size]) for i in range(0, size * size, size)]
+                node = PackedFifteensNode(board=board)
+                if node.state in reachable:
+                    self.assertTrue(node.is_solvable())
+                    self.assertTrue(FifteensNode(board=board).is_solvable())
+                elif limit is None:
+                    self.assertFalse(node.is_solvable())
+
+    def test_unsolvable(self):
+        """Test that the search engines return None at once for a board of the wrong parity.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10 11 12\n13 15 14  0'
+        stats = SearchStats()
+        self.assertIsNone(Astar(FifteensNode(input_str=input_str), stats=stats))
+        self.assertEqual(stats.expanded, 0)
+        self.assertIsNone(IDAstar(PackedFifteensNode(input_str=input_str)))
+        self.assertIsNone(BidirectionalAstar(PackedFifteensNode(input_str=input_str)))
+        self.assertEqual(list(ARAstar(PackedFifteensNode(input_str=input_str))), [])
+
+    def test_other_sizes(self):
+        """Test that both node classes solve the 8 and the 24 puzzle optimally.
+        """
+        eight = '8 6 7\n2 5 4\n3 0 1'  # one of the hardest boards, 31 moves
+        for cls in (FifteensNode, PackedFifteensNode):
+            path = Astar(cls(input_str=eight))
+            self.assertEqual(len(path) - 1, 31)
+            self.assertEqual(path[-1].board, [[1, 2, 3], [4, 5, 6], [7, 8, 0]])
+        twenty_four = ' 1  2  3  4  5\n 6  7  8  9 10\n11 12 13 14 15\n16 17 18 24 19\n21 22 23  0 20'
+        for cls in (FifteensNode, PackedFifteensNode):
+            path = Astar(cls(input_str=twenty_four))
+            self.assertEqual(len(path) - 1, 3)
+            self.assertTrue(path[-1].is_goal())
+            self.assertEqual(path[-1].board[4], [21, 22, 23, 24, 0])
+        self.assertIs(PackedFifteensNode(input_str=twenty_four).goal, standard_goal(5))
+        self.assertEqual(standard_goal(5).bits, 5)
+
+    def test_lazy_successors(self):
+        """Test that the lazy successors build the same children as generate_children, with or without a heuristic.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12'
+        for cls in (FifteensNode, PackedFifteensNode):
+            for heuristic in (None, HEURISTICS['linear-conflict']):
+                node = cls(input_str=input_str, heuristic=heuristic).generate_children()[0]
+                children = node.generate_children()
+                successors = list(node.successors())
+                self.assertEqual([(child.state, child.g) for child in children],
+                                 [(state, g) for state, g, _ in successors])
+                for child, (_, _, move) in zip(children, successors):
+                    lazy = node.make_child(move)
+                    self.assertEqual((lazy.state, lazy.g, lazy.f), (child.state, child.g, child.f))
+                    self.assertIs(lazy.parent, node)
+        root = SuperqueensNode(n=4)
+        self.assertEqual([state for state, _, _ in root.successors()],
+                         [child.state for child in root.generate_children()])
+
+
+class TestPackedFifteens(unittest.TestCase):
+    def test_board_round_trip(self):
+        """Test that the packed node exposes the same board and string as FifteensNode.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12'
+        packed_root = PackedFifteensNode(input_str=input_str)
+        fifteens_root = FifteensNode(input_str=input_str)
+        self.assertEqual(packed_root.board, fifteens_root.board)
+        self.assertEqual(str(packed_root), str(fifteens_root))
+        self.assertEqual(packed_root.evaluate_heuristic(), fifteens_root.evaluate_heuristic())
+
+    def test_node_expansions(self):
+        """Test that the children match the ones of FifteensNode.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12'
+        packed_children = PackedFifteensNode(input_str=input_str).generate_children()
+        fifteens_children = FifteensNode(input_str=input_str).generate_children()
+        self.assertEqual(sorted(c.board for c in packed_children), sorted(c.board for c in fifteens_children))
+        self.assertTrue(all(c.board[c.blank // 4][c.blank % 4] == 0 for c in packed_children))
+
+    def test_compact_layout(self):
+        """Test that the nodes have no per-node dict, share the goal of their root and rebuild their board.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12'
+        root = PackedFifteensNode(input_str=input_str)
+        child = root.generate_children()[0]
+        self.assertFalse(hasattr(child, '__dict__'))
+        self.assertIs(child.goal, root.goal)
+        self.assertEqual(child.board[child.blank // 4][child.blank % 4], 0)
+        root = FifteensNode(input_str=input_str)
+        child = root.generate_children()[0]
+        self.assertFalse(hasattr(child, '__dict__'))
+        self.assertIs(child.goal, root.goal)
+        self.assertEqual(child.board[child.blank // 4][child.blank % 4], 0)
+        self.assertEqual([node.board for node in child.get_path()],
+                         [[[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 0, 11], [13, 14, 15, 12]],
+                          [[1, 2, 3, 4], [5, 6, 0, 8], [9, 10, 7, 11], [13, 14, 15, 12]]])
+
+    def test_a_star_algorithm(self):
+        """Test that Astar solves the sample configuration with packed nodes.
+        """
+        input_str = '1  2  3  4\n5  6  7  8\n9 10  0 11\n13 14 15 12'
+        path = Astar(PackedFifteensNode(input_str=input_str))
+        self.assertEqual(len(path), 3)
+        self.assertTrue(path[-1].is_goal())
+
+
+class TestHeuristics(unittest.TestCase):
+    instances = [
+        '1 6 0 2\n5 8 10 3\n13 9 11 4\n15 14 7 12',
+        '2 4 8 11\n1 7 3 15\n5 13 0 10\n9 14 12 6',
+        '1 9 2 8\n5 0 4 3\n10 6 11 12\n13 14 15 7',
+        '9 6 0 4\n1 3 5 2\n13 7 15 8\n14 12 10 11',
+    ]
+
+    def test_goal_is_zero(self):
+        """Test that every heuristic evaluates the goal configuration to 0.
+        """
+        for heuristic in HEURISTICS.values():
+            self.assertEqual(heuristic(list(range(1, 16)) + [0]), 0)
+
+    def test_dominate_manhattan(self):
+        """Test that linear conflict and walking distance are at least the Manhattan distance.
+        """
+        for input_str in self.instances:
+            tiles = [int(n) for n in input_str.split()]
+            manhattan = HEURISTICS['manhattan'](tiles)
+            self.assertEqual(manhattan, PackedFifteensNode(input_str=input_str).evaluate_heuristic())
+            self.assertGreaterEqual(HEURISTICS['linear-conflict'](tiles), manhattan)
+            self.assertGreaterEqual(HEURISTICS['walking-distance'](tiles), manhattan)
+
+    def test_compare_on_fixed_instances(self):
+        """Test that all heuristics find optimal solutions of the same length on a fixed instance set,
+        and that the stronger ones need fewer expansions. The expansions and times are reported.
+        """
+        report = {}
+        for name, heuristic in sorted(HEURISTICS.items()):
+            lengths, expansions, start = [], 0, time.perf_counter()
+            for input_str in self.instances:
+                stats = SearchStats()
+                path = Astar(PackedFifteensNode(input_str=input_str, heuristic=heuristic), stats=stats)
+                lengths.append(len(path))
+                expansions += stats.expanded
+            report[name] = (lengths, expansions, time.perf_counter() - start)
+        print('\n'.join('%-18s %8d expansions %8.3f s' % (name, e, t) for name, (_, e, t) in report.items()))
+        self.assertEqual(report['linear-conflict'][0], report['manhattan'][0])
+        self.assertEqual(report['walking-distance'][0], report['manhattan'][0])
+        self.assertLess(report['linear-conflict'][1], report['manhattan'][1])
+        self.assertLess(report['walking-distance'][1], report['manhattan'][1])
+
+
+class TestPatternDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pdb = AdditivePDB([PatternDatabase.build((1, 2, 3)), PatternDatabase.build((4, 8))])
+
+    def test_goal_is_zero(self):
+        """Test that the pattern databases evaluate the goal configuration to 0.
+        """
+        self.assertEqual(self.pdb(list(range(1, 16)) + [0]), 0)
+
+    def test_dominates_manhattan(self):
+        """Test that a pattern entry is at least the Manhattan distance of its tiles.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        board = FifteensNode(input_str=input_str).board
+        manhattan = sum(abs(x - (t - 1) // 4) + abs(y - (t - 1) % 4)
+                        for x, row in enumerate(board) for y, t in enumerate(row) if t in (1, 2, 3, 4, 8))
+        self.assertGreaterEqual(self.pdb([n for row in board for n in row]), manhattan)
+
+    def test_save_and_load(self):
+        """Test that memory-mapped tables hold the same entries as the built ones.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            self.pdb.save(directory)
+            self.assertEqual(sorted(os.listdir(directory)), ['pdb-1-2-3.bin', 'pdb-4-8.bin'])
+            loaded = AdditivePDB.load(directory, [(1, 2, 3), (4, 8)])
+            for database, original in zip(loaded.databases, self.pdb.databases):
+                self.assertEqual(database.table[:], bytes(original.table))
+                database.table.close()
+
+    def test_a_star_algorithm(self):
+        """Test that Astar finds solutions as short with the pattern databases as with Manhattan.
+        """
+        input_str = '5  1  4  8\n7  0  2 11\n9  3 14 10\n6 13 15 12'
+        manhattan_path = Astar(PackedFifteensNode(input_str=input_str))
+        pdb_path = Astar(PackedFifteensNode(input_str=input_str, heuristic=self.pdb))
+        self.assertEqual(len(pdb_path), len(manhattan_path))
+        self.assertTrue(pdb_path[-1].is_goal())
+
+
 class TestSuperqueens(unittest.TestCase):
     def test_constucting_instances(self):
         """Test that an instance of SuperqueensNode can be created without an error."""
@@ -81,6 +804,77 @@ class TestSuperqueens(unittest.TestCase):
         superqueens_root = SuperqueensNode(n=7)
         superqueens_root.evaluate_heuristic()
 
+    def test_conflict_masks(self):
+        """Test that the conflicts counted with bitmasks match a pairwise count.
+        """
+        node = SuperqueensNode(n=7)
+        for column in (3, 5, 1, 6, 0):
+            node = [child for child in node.generate_children() if child.queen_positions[-1][1] == column][0]
+        self.assertEqual(node.g, self._conflicts(node.queen_positions))
+        self.assertEqual(len(node.generate_children()), 2)
+        self.assertFalse(node.can_add_queen((5, 3)))
+        self.assertTrue(node.can_add_queen((5, 2)))
+
+    def test_heuristic_is_admissible(self):
+        """Test that the heuristic never exceeds the conflicts added by the best completion of a node.
+        """
+        n = 6
+        best = {}
+        for columns in permutations(range(n)):
+            total = self._conflicts(list(enumerate(columns)))
+            for k in range(n + 1):
+                prefix = columns[:k]
+                remaining = total - self._conflicts(list(enumerate(prefix)))
+                best[prefix] = min(best.get(prefix, remaining), remaining)
+        for prefix, remaining in best.items():
+            node = SuperqueensNode(n=n, queen_positions=list(enumerate(prefix)))
+            self.assertLessEqual(node.evaluate_heuristic(), remaining)
+
+    def test_optimal_conflicts(self):
+        """Test that Astar with the heuristic finds the fewest conflicts of all placements.
+        """
+        for n in (5, 6, 7):
+            fewest = min(self._conflicts(list(enumerate(columns))) for columns in permutations(range(n)))
+            path = Astar(SuperqueensNode(n=n))
+            self.assertEqual(path[-1].g, fewest)
+            self.assertEqual(self._conflicts(path[-1].queen_positions), fewest)
+
+    def test_symmetry_breaking(self):
+        """Test that symmetry breaking keeps the optimal conflicts with fewer expansions.
+        """
+        for n in (6, 7, 8):
+            stats, broken_stats = SearchStats(), SearchStats()
+            path = Astar(SuperqueensNode(n=n), stats=stats)
+            broken_path = Astar(SuperqueensNode(n=n, break_symmetry=True), stats=broken_stats)
+            self.assertEqual(broken_path[-1].g, path[-1].g)
+            self.assertEqual(broken_path[-1].g, self._conflicts(broken_path[-1].queen_positions))
+            self.assertLess(broken_stats.generated, stats.generated)
+        root = SuperqueensNode(n=7, break_symmetry=True)
+        self.assertEqual([c.queen_positions[0][1] for c in root.generate_children()], [0, 1, 2, 3])
+        middle = root.generate_children()[3]
+        left, right = [c for c in middle.generate_children() if c.queen_positions[1][1] in (1, 5)]
+        self.assertEqual(left.state, right.state)
+
+    def test_min_conflicts(self):
+        """Test that the local search returns complete placements whose g is their number of conflicts.
+        """
+        for n, max_steps in ((8, 2000), (30, None), (30, 0)):
+            node = min_conflicts(n, time_limit=5, max_steps=max_steps, seed=270)
+            self.assertTrue(node.is_goal())
+            self.assertEqual(sorted(y for x, y in node.queen_positions), list(range(n)))
+            self.assertEqual(node.g, self._conflicts(node.queen_positions))
+            if max_steps != 0:
+                self.assertEqual(node.g, 2 if n == 8 else 0)
+
+    @staticmethod
+    def _conflicts(queen_positions):
+        pairs = 0
+        for i, (x, y) in enumerate(queen_positions):
+            for x1, y1 in queen_positions[:i]:
+                dx, dy = abs(x - x1), abs(y - y1)
+                pairs += dx == dy or dx + dy == 3
+        return pairs
+
     def test_a_star_algorithm(self):
         """Test that the length of the solution path is 8 when the board size is 7,
         the last state is the goal state, and there is no queen in the initial state."""